@@ -0,0 +1,68 @@
+# pylint: disable=wrong-import-position, multiple-statements
+from __future__ import annotations
+
+import os; os.sys.dont_write_bytecode = True
+from typing import Optional, Tuple, List, Dict
+from argparse import ArgumentParser
+from time import perf_counter
+from statistics import mean
+import cv2
+from libs import starfield, encoders
+
+__all__ = ['run']
+
+resolutions = [(640, 360), (1280, 720), (1920, 1080)]
+qualities = [50, 75, 90]
+configurations = [
+    ('webp', {}),
+    ('jpeg', {}),
+    ('jpeg', {'optimize': True}),
+    ('jpeg', {'progressive': True}),
+    ('png', {'compression': 1})
+]
+
+
+def _frames(size: Tuple[int, int], count: int, seed: int) -> List:
+    field = starfield.StarField(1920, 1080, seed=seed, ring_size=count)
+    return [cv2.resize(field.frame(index), size) for index in range(count)]
+
+
+def run(
+        frames: Optional[int] = 8, seed: Optional[int] = 0,
+        sizes: Optional[List[Tuple[int, int]]] = None
+    ) -> List[Dict]:
+    results = []
+    for size in sizes or resolutions:
+        images = _frames(size, frames, seed)
+        for codec, options in configurations:
+            encoder = encoders.encoder_factory(codec, **options)
+            for quality in (qualities if codec != 'png' else qualities[:1]):
+                timings, lengths = [], []
+                for image in images:
+                    started = perf_counter()
+                    lengths.append(len(encoder.encode(image, quality)))
+                    timings.append(perf_counter() - started)
+                results.append({
+                    'codec': codec, 'options': options,
+                    'width': size[0], 'height': size[1], 'quality': quality,
+                    'encode_ms': mean(timings) * 1e3, 'bytes': int(mean(lengths))
+                })
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Preview encoder cost per codec and resolution')
+    parser.add_argument('--frames', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+    for result in run(frames=arguments.frames, seed=arguments.seed):
+        options = ','.join(f'{key}={value}' for key, value in result['options'].items())
+        print(
+            f"{result['codec'] + ('[' + options + ']' if options else ''):28}"
+            f"{result['width']:>5}x{result['height']:<5} q={result['quality']:<3}"
+            f"{result['encode_ms']:9.2f} ms {result['bytes']:>9} B"
+        )
+
+
+if __name__ == '__main__':
+    main()
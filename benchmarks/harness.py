@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Union, List, Dict
+from datetime import datetime, timezone
+from statistics import mean, median
+from time import perf_counter
+import platform
+import json
+
+from pygit2.errors import GitError
+from pygit2 import Repository # pylint: disable=ungrouped-imports
+
+__all__ = [
+    'measure', 'environment', 'save_results',
+    'load_results', 'compare', 'format_results',
+    'format_comparison'
+]
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def _calibrate(function: Callable[[], None], min_time: float) -> int:
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        if perf_counter() - start >= min_time or number >= 1 << 20:
+            return number
+        number *= 4
+
+
+def measure(
+        function: Callable[[], None], repeat: Optional[int] = 30,
+        min_time: Optional[float] = 0.002
+    ) -> Dict[str, Union[int, float]]:
+    number = _calibrate(function, min_time)
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((perf_counter() - start) / number * 1e6)
+    return {
+        'p50_us': median(samples),
+        'p95_us': _percentile(samples, 95),
+        'mean_us': mean(samples),
+        'min_us': min(samples),
+        'repeat': repeat,
+        'number': number
+    }
+
+
+def environment() -> Dict[str, Optional[str]]:
+    try:
+        commit = str(Repository('.').head.target)
+    except GitError:
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform()
+    }
+
+
+def save_results(path: str, results: Dict[str, Dict]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'environment': environment(), 'results': results}, file, indent=4)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)['results']
+
+
+def compare(
+        baseline: Dict[str, Dict], current: Dict[str, Dict],
+        threshold: Optional[float] = 0.15, metric: Optional[str] = 'p50_us'
+    ) -> List[Dict[str, Union[str, float, bool]]]:
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name][metric], current[name][metric]
+        change = after / before - 1 if before else 0.0
+        rows.append({
+            'name': name, 'baseline': before, 'current': after,
+            'change': change, 'regression': change > threshold
+        })
+    return rows
+
+
+def format_results(results: Dict[str, Dict]) -> str:
+    width = max(map(len, results), default=0) + 2
+    return '\n'.join(
+        f"{name:{width}}{result['p50_us']:>12.2f} us  p95 {result['p95_us']:>12.2f} us"
+        for name, result in results.items()
+    )
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    width = max((len(row['name']) for row in rows), default=0) + 2
+    return '\n'.join(
+        f"{row['name']:{width}}{row['baseline']:>12.2f} -> {row['current']:>12.2f} us"
+        f"{row['change']:>+9.1%}{'  REGRESSION' if row['regression'] else ''}"
+        for row in rows
+    )
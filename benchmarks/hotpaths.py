@@ -0,0 +1,176 @@
+# pylint: disable=unused-import, reimported, multiple-statements, wrong-import-position, ungrouped-imports
+from __future__ import annotations
+
+import os; os.sys.dont_write_bytecode = True
+from typing import Callable, Optional, Tuple, List, Dict
+from argparse import ArgumentParser
+from itertools import count
+from time import perf_counter
+import sys
+import utils
+from libs import (
+    pynquirer,
+    synscan,
+    pipeline,
+    starfield,
+    quality,
+    encoders,
+    tiles,
+    buffers,
+    imaging,
+    stacking,
+    photos,
+    fits,
+    synscan_simulator,
+    metrics,
+    profiler,
+    tracing,
+    streaming,
+    renditions,
+    eventloop,
+    lifecycle,
+)
+from interfaces import camera, mount
+from models import camera, mount
+from interfaces import telescope
+from models import telescope
+from benchmarks import harness, synscan_executor
+from benchmarks.encoders import resolutions, qualities
+
+__all__ = ['cases', 'run']
+
+Case = Tuple[str, Callable[[], None]]
+
+_source_size = (1920, 1080)
+
+
+def _telescope(size: Tuple[int, int], quality_: int, codec: str) -> telescope.BaseTelescope:
+    return telescope.MockTelescope(
+        telescope_id='benchmark', server={},
+        camera=camera.MockCamera(), mount=mount.MockMount(),
+        WEBP_IMAGE_WIDTH=str(size[0]), WEBP_IMAGE_HEIGHT=str(size[1]),
+        WEBP_IMAGE_QUALITY=str(quality_), PREVIEW_CODEC=codec,
+        STREAM_ADAPTIVE='0', PIPELINE_WORKERS='1'
+    )
+
+
+def _process_image_case(
+        size: Tuple[int, int], quality_: int, codec: str,
+        image_type: Optional[str] = 'RGB24'
+    ) -> Case:
+    instance = _telescope(size, quality_, codec)
+    field = starfield.StarField(*_source_size, image_type=image_type, ring_size=4)
+    frames = [field.frame(index) for index in range(4)]
+    image_format = (image_type, 'RG' if image_type.startswith('RAW') else None)
+    position = {'ra': '0h 0m 0s', 'dec': '0° 0’ 0”', 'timestamp': 0.0, 'extrapolated': False}
+    sequence = count(1)
+    def process() -> None:
+        seq = next(sequence)
+        captured = perf_counter()
+        instance._process_image( # pylint: disable=protected-access
+            frames[seq % 4], position, seq, image_format,
+            {'exposure_end': captured, 'coordinates': captured}
+        )
+    name = f'process_image/{codec}/{image_type}/{size[0]}x{size[1]}/q{quality_}'
+    return name, process
+
+
+def process_image_cases(codec: str) -> List[Case]:
+    cases_ = [
+        _process_image_case(size, quality_, codec)
+        for size in resolutions for quality_ in qualities
+    ]
+    cases_.append(_process_image_case(resolutions[-1], qualities[1], codec, 'RAW16'))
+    return cases_
+
+
+def formatter_cases() -> List[Case]:
+    formatter = synscan.SynScanFormatter
+    return [
+        ('synscan/decode_coordinate/precise',
+            lambda: formatter._decode_coordinate('34AB0C00,12CE0500')), # pylint: disable=protected-access
+        ('synscan/decode_coordinate/short',
+            lambda: formatter._decode_coordinate('34AB,12CE')), # pylint: disable=protected-access
+        ('synscan/encode_coordinate/precise',
+            lambda: formatter._encode_coordinate((0.2057, 0.0734), True)), # pylint: disable=protected-access
+        ('synscan/format_ra_dec',
+            lambda: formatter.format_ra_dec(0.2057, 0.0734)),
+        ('synscan/parse_ra_dec',
+            lambda: synscan.SynScanObject.parse_ra_dec('4h 56m 12s', '26° 25’ 31”')),
+        ('synscan/format_datetime',
+            lambda: formatter.format_datetime([21, 30, 15, 10, 16, 26, 3, 0])),
+        ('synscan/format_location',
+            lambda: formatter.format_location([55, 45, 7, 0, 37, 37, 6, 1]))
+    ]
+
+
+def executor_cases() -> List[Case]:
+    executor = synscan_executor.FakeSerialExecutor()
+    return [
+        ('synscan/execute/get_ra_dec', executor.get_ra_dec),
+        ('synscan/execute/echo', lambda: executor.execute('Kx'))
+    ]
+
+
+def utils_cases() -> List[Case]:
+    return [
+        ('utils/random_hash/16', lambda: utils.random_hash(16)),
+        ('utils/random_hash/default', utils.random_hash),
+        ('utils/get_kwargs_or_dotenv_values/single',
+            lambda: utils.get_kwargs_or_dotenv_values('WEBP_IMAGE_QUALITY')),
+        ('utils/get_kwargs_or_dotenv_values/list', lambda: utils.get_kwargs_or_dotenv_values(
+            variables=[
+                'STREAM_ADAPTIVE', 'STREAM_TARGET_FPS', 'STREAM_TARGET_BITRATE',
+                'STREAM_MIN_SCALE', 'STREAM_MIN_QUALITY', 'STREAM_MAX_QUALITY'
+            ], kwargs={'STREAM_ADAPTIVE': '0'}
+        ))
+    ]
+
+
+def cases(codec: Optional[str] = 'webp') -> List[Case]:
+    return [
+        *utils_cases(), *formatter_cases(),
+        *executor_cases(), *process_image_cases(codec)
+    ]
+
+
+def run(
+        codec: Optional[str] = 'webp', pattern: Optional[str] = None,
+        repeat: Optional[int] = 30
+    ) -> Dict[str, Dict]:
+    results = {}
+    for name, function in cases(codec):
+        if pattern is None or pattern in name:
+            results[name] = harness.measure(
+                function, repeat=repeat if 'process_image' not in name else max(repeat // 3, 5)
+            )
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Hot path micro-benchmarks')
+    parser.add_argument('--codec', default='webp')
+    parser.add_argument('--filter', dest='pattern', default=None,
+        help='only run benchmarks whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--output', default=None, help='write results to a JSON file')
+    parser.add_argument('--compare', default=None, help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+        help='relative p50 slowdown reported as a regression')
+    arguments = parser.parse_args()
+    results = run(codec=arguments.codec, pattern=arguments.pattern, repeat=arguments.repeat)
+    if arguments.output:
+        harness.save_results(arguments.output, results)
+    if arguments.compare is None:
+        print(harness.format_results(results))
+        return
+    rows = harness.compare(
+        harness.load_results(arguments.compare), results, threshold=arguments.threshold
+    )
+    print(harness.format_comparison(rows))
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
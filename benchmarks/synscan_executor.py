@@ -0,0 +1,154 @@
+# pylint: disable=wrong-import-position, multiple-statements
+from __future__ import annotations
+
+import os; os.sys.dont_write_bytecode = True
+from typing import Optional, Union, List, Dict
+from threading import Thread, Condition
+from argparse import ArgumentParser
+from time import perf_counter, sleep
+from statistics import mean
+import utils
+from libs import synscan, synscan_simulator
+
+__all__ = ['FakeSerial', 'FakeSerialExecutor', 'SimulatorExecutor', 'run']
+
+
+class FakeSerial:
+
+    responses = {
+        'e': b'34AB0C00,12CE0500#', 'E': b'34AB,12CE#',
+        'z': b'34AB0C00,12CE0500#', 'Z': b'34AB,12CE#',
+        't': b'\x02#', 'J': b'\x01#', 'm': b'\x00#', 'p': b'W#',
+        'V': b'042507#'
+    }
+
+    def __init__(self, latency: Optional[float] = 0.0) -> None:
+        self.latency = latency
+        self._condition = Condition()
+        self._pending = []
+
+    def write(self, data: bytes) -> int:
+        command = data.rstrip(b'\r').decode('latin-1')
+        if command[0] == 'K':
+            response = command[1:2].encode('latin-1') + b'#'
+        else:
+            response = self.responses.get(command[0], b'#')
+        with self._condition:
+            self._pending.append(response)
+            self._condition.notify()
+        return len(data)
+
+    def read_until(self, expected: bytes = b'#') -> bytes:
+        if self.latency:
+            sleep(self.latency)
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending)
+            response = self._pending.pop(0)
+        assert response.endswith(expected)
+        return response
+
+
+class FakeSerialExecutor(synscan.SynScanGetter, synscan.SynScanCommander):
+
+    def __init__(self, latency: Optional[float] = 0.0) -> None:
+        self._latency = latency
+        super().__init__(port='fake')
+
+    def _open_serial(self, baudrate: int) -> FakeSerial:
+        return FakeSerial(latency=self._latency)
+
+
+class SimulatorExecutor(synscan.SynScanGetter, synscan.SynScanCommander):
+
+    def __init__(self,
+            latency: Optional[float] = 0.0, baudrate: Optional[int] = 9600
+        ) -> None:
+        self.simulator = synscan_simulator.SynScanSimulator(latency=latency, baudrate=baudrate)
+        super().__init__(port=self.simulator.start(), baudrate=baudrate)
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def measure_latency(executor: synscan.SynScanGetter, commands: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(commands):
+        start = perf_counter()
+        executor.get_ra_dec()
+        samples.append((perf_counter() - start) * 1e6)
+    return {
+        'mean_us': mean(samples),
+        'p50_us': _percentile(samples, 50),
+        'p99_us': _percentile(samples, 99)
+    }
+
+
+def measure_throughput(
+        executor: synscan.SynScanGetter, commands: int, threads: int
+    ) -> Dict[str, float]:
+    def worker() -> None:
+        for _ in range(commands // threads):
+            executor.get_ra_dec()
+    workers = [Thread(target=worker) for _ in range(threads)]
+    start = perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = perf_counter() - start
+    return {
+        'threads': threads,
+        'commands_per_s': (commands // threads) * threads / elapsed
+    }
+
+
+def measure_stop_latency(
+        executor: synscan.SynScanGetter, queued: int
+    ) -> Dict[str, float]:
+    telemetry = [executor.submit('e') for _ in range(queued)]
+    start = perf_counter()
+    executor.execute('P\x02\x10$\x00\x00\x00\x00', priority=synscan.CommandPriority.SAFETY)
+    stop_us = (perf_counter() - start) * 1e6
+    for future in telemetry:
+        future.result()
+    return {
+        'queued_telemetry': queued,
+        'stop_us': stop_us,
+        'drain_us': (perf_counter() - start) * 1e6
+    }
+
+
+def run(
+        commands: Optional[int] = 2000, threads: Optional[int] = 4,
+        latency: Optional[float] = 0.0, baudrate: Optional[int] = None
+    ) -> Dict[str, Union[float, Dict[str, float]]]:
+    if baudrate is None:
+        executor = FakeSerialExecutor(latency=latency)
+    else:
+        executor = SimulatorExecutor(latency=latency, baudrate=baudrate)
+    return {
+        'latency': measure_latency(executor, commands),
+        'throughput': measure_throughput(executor, commands, threads),
+        'stop_behind_telemetry': measure_stop_latency(executor, queued=threads * 8)
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description='SynScanExecutor round-trip benchmark')
+    parser.add_argument('--commands', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='simulated serial latency per command, seconds')
+    parser.add_argument('--simulator', type=int, default=None, metavar='BAUDRATE',
+        help='run against the pty SynScan simulator at this baud rate')
+    arguments = parser.parse_args()
+    print(utils.json_stringify(run(
+        commands=arguments.commands, threads=arguments.threads,
+        latency=arguments.latency, baudrate=arguments.simulator
+    )))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
+from threading import Event
 from zwoasi import Camera
-from typing import Union
+from typing import Optional, Union
 import numpy as np
 
 __all__ = ['CameraInterface']
@@ -10,9 +11,13 @@ __all__ = ['CameraInterface']
 
 class CameraInterface(metaclass=ABCMeta):
 
-    _changed: bool
-    _running: bool
+    _changed: Event
+    _running: Event
     _camera: Union[Camera, None]
+    name: str
+    parameters: dict
+    color_format: str
+    bayer_pattern: Optional[str]
 
     @abstractmethod
     def capture_video_frame(self) -> np.ndarray:
@@ -31,5 +36,5 @@ class CameraInterface(metaclass=ABCMeta):
         ...
 
     @abstractmethod
-    def _capture(self, filename: str) -> None:
+    def _capture(self) -> np.ndarray:
         ...
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
-from typing import Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 libs = __import__('sys').modules['libs'] # import ..models
 
@@ -11,11 +11,20 @@ __all__ = ['MountInterface']
 class MountInterface(metaclass=ABCMeta):
 
     _mount: Union[libs.SynScanObject, None]
+    on_failure: Optional[Callable[[Exception], None]]
 
     @abstractmethod
     def get_coordinates(self) -> Tuple[str, str]:
         ...
 
+    @abstractmethod
+    def get_coordinate_sample(self) -> Tuple[float, float, float, bool]:
+        ...
+
+    @abstractmethod
+    def get_ra_dec(self) -> Tuple[float, float]:
+        ...
+
     @abstractmethod
     def start_slew(self, data: dict) -> None:
         ...
@@ -27,3 +36,7 @@ class MountInterface(metaclass=ABCMeta):
     @abstractmethod
     def goto_coordinates(self, data: dict) -> None:
         ...
+
+    @abstractmethod
+    def close(self, timeout: Optional[float] = None) -> bool:
+        ...
@@ -1,23 +1,26 @@
 from __future__ import annotations
 # pylint: disable=R0801
 from abc import ABCMeta, abstractmethod
-from typing import Type, Union
-from threading import Thread
-from socketio import Client
+from typing import Optional, Type
+from socketio import Client, AsyncClient
 
 models = __import__('sys').modules['models'] # import ..models
+libs = __import__('sys').modules['libs'] # import ..libs
 
-__all__ = ['TelescopeInterface']
+__all__ = ['TelescopeInterface', 'AsyncTelescopeInterface']
 
 
 class TelescopeInterface(metaclass=ABCMeta):
 
     telescope_id: str
     server: dict
-    _frame: dict
+    _frame: libs.pipeline.FrameSlot
+    _metrics: libs.metrics.MetricsRegistry
+    _clock: libs.tracing.TraceClock
     camera: Type[models.camera.BaseCamera]
     mount: Type[models.mount.BaseMount]
-    hardware_thread: Union[Thread, None]
+    _hardware: libs.lifecycle.Worker
+    _lifecycle: libs.lifecycle.LifecycleManager
     sio: Client
 
     @abstractmethod
@@ -29,13 +32,29 @@ class TelescopeInterface(metaclass=ABCMeta):
         ...
 
     @abstractmethod
-    def get_frame(self) -> None:
+    def get_frame(self, data: Optional[dict] = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def start_stream(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    def frame_ack(self, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    def stop_stream(self, data: Optional[dict] = None) -> dict:
         ...
 
     @abstractmethod
     def camera_settings_changed(self, data: dict) -> None:
         ...
 
+    @abstractmethod
+    def stream_settings_changed(self, data: dict) -> Optional[dict]:
+        ...
+
     @abstractmethod
     def mount_settings_changed(self, data: dict) -> None:
         ...
@@ -53,5 +72,81 @@ class TelescopeInterface(metaclass=ABCMeta):
         ...
 
     @abstractmethod
-    def take_photo(self) -> None:
+    def take_photo(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    def metrics(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    def profile(self, data: Optional[dict] = None) -> dict:
+        ...
+
+
+class AsyncTelescopeInterface(metaclass=ABCMeta):
+
+    telescope_id: str
+    server: dict
+    telescope: TelescopeInterface
+    sio: AsyncClient
+
+    @abstractmethod
+    async def connect(self) -> None:
+        ...
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        ...
+
+    @abstractmethod
+    async def get_frame(self, data: Optional[dict] = None) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def start_stream(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    async def frame_ack(self, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def stop_stream(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    async def camera_settings_changed(self, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def stream_settings_changed(self, data: dict) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def mount_settings_changed(self, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def start_slew(self, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def stop_slew(self) -> None:
+        ...
+
+    @abstractmethod
+    async def stop_actions(self) -> None:
+        ...
+
+    @abstractmethod
+    async def take_photo(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    async def metrics(self, data: Optional[dict] = None) -> dict:
+        ...
+
+    @abstractmethod
+    async def profile(self, data: Optional[dict] = None) -> dict:
         ...
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple, Dict
+from threading import Condition
+import numpy as np
+
+__all__ = ['FrameBufferPool']
+
+
+class FrameBufferPool:
+
+    def __init__(self, shape: Tuple[int, ...], dtype: np.dtype, count: int) -> None:
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._condition = Condition()
+        self._buffers: Dict[int, Tuple[bytearray, np.ndarray]] = {}
+        self._free = []
+        size = int(np.prod(self.shape)) * self.dtype.itemsize
+        for _ in range(count):
+            buffer = bytearray(size)
+            array = np.frombuffer(buffer, dtype=self.dtype).reshape(self.shape)
+            self._buffers[id(array)] = buffer, array
+            self._free.append(array)
+
+    def matches(self, shape: Tuple[int, ...], dtype: np.dtype) -> bool:
+        return self.shape == tuple(shape) and self.dtype == np.dtype(dtype)
+
+    def owns(self, array: np.ndarray) -> bool:
+        return self._buffers.get(id(array), (None, None))[1] is array
+
+    def buffer(self, array: np.ndarray) -> bytearray:
+        return self._buffers[id(array)][0]
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._free, timeout):
+                return None
+            return self._free.pop()
+
+    def release(self, array: np.ndarray) -> None:
+        if not self.owns(array):
+            return
+        with self._condition:
+            self._free.append(array)
+            self._condition.notify()
+
+    @property
+    def available(self) -> int:
+        with self._condition:
+            return len(self._free)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from abc import ABCMeta, abstractmethod
+from typing import Optional, List, Dict, Type, Any
+import numpy as np
+import cv2
+
+__all__ = [
+    'PreviewEncoder', 'WebpEncoder', 'JpegEncoder',
+    'PngEncoder', 'encoder_factory', 'available_encoders'
+]
+
+
+class PreviewEncoder(metaclass=ABCMeta):
+
+    name: str
+    extension: str
+    mime: str
+    quality_sensitive = True
+
+    def __init__(self, **options: Optional[Any]) -> None:
+        self.options = options
+
+    @abstractmethod
+    def _parameters(self, quality: int) -> List[int]:
+        ...
+
+    def encode(self, image: np.ndarray, quality: int) -> bytes:
+        success, buffer = cv2.imencode(self.extension, image, self._parameters(quality))
+        if not success:
+            raise ValueError(f'Unable to encode {image.shape} frame as {self.name!r}')
+        return buffer.tobytes()
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'mime': self.mime, 'options': self.options}
+
+
+class WebpEncoder(PreviewEncoder):
+
+    name = 'webp'
+    extension = '.webp'
+    mime = 'image/webp'
+
+    def _parameters(self, quality: int) -> List[int]:
+        return [cv2.IMWRITE_WEBP_QUALITY, quality]
+
+
+class JpegEncoder(PreviewEncoder):
+
+    name = 'jpeg'
+    extension = '.jpg'
+    mime = 'image/jpeg'
+
+    def __init__(self,
+            optimize: Optional[bool] = False,
+            progressive: Optional[bool] = False
+        ) -> None:
+        super().__init__(optimize=optimize, progressive=progressive)
+        self._flags = [
+            cv2.IMWRITE_JPEG_OPTIMIZE, int(optimize),
+            cv2.IMWRITE_JPEG_PROGRESSIVE, int(progressive)
+        ]
+
+    def _parameters(self, quality: int) -> List[int]:
+        return [cv2.IMWRITE_JPEG_QUALITY, quality, *self._flags]
+
+
+class PngEncoder(PreviewEncoder):
+
+    name = 'png'
+    extension = '.png'
+    mime = 'image/png'
+    # lossless, only the frame size changes the encoded length
+    quality_sensitive = False
+
+    def __init__(self, compression: Optional[int] = 1) -> None:
+        super().__init__(compression=compression)
+
+    def _parameters(self, quality: int) -> List[int]:
+        return [cv2.IMWRITE_PNG_COMPRESSION, self.options['compression']]
+
+
+_probe = np.zeros((8, 8, 3), np.uint8)
+
+_encoders: Dict[str, Type[PreviewEncoder]] = {
+    encoder.name: encoder for encoder in (WebpEncoder, JpegEncoder, PngEncoder)
+}
+
+
+def available_encoders() -> List[str]:
+    return list(_encoders)
+
+
+def encoder_factory(codec: str, **options: Optional[Any]) -> PreviewEncoder:
+    if codec not in _encoders:
+        raise ValueError(f'Codec {codec!r} is not defined')
+    try:
+        encoder = _encoders[codec](**options)
+        encoder.encode(_probe, 75)
+    except (TypeError, ValueError, cv2.error) as exception:
+        raise ValueError(f'Options {options!r} are not valid for codec {codec!r}') from exception
+    return encoder
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Optional, Any
+from socketio import AsyncClient
+import asyncio
+
+__all__ = ['ThreadsafeClient']
+
+
+class ThreadsafeClient:
+
+    def __init__(self, client: AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+        self._client = client
+        self._loop = loop
+
+    @property
+    def connected(self) -> bool:
+        return self._client.connected and not self._loop.is_closed()
+
+    def connect(self, *args: Any, **kwargs: Any) -> None:
+        asyncio.run_coroutine_threadsafe(
+            self._client.connect(*args, **kwargs), self._loop
+        ).result()
+
+    def disconnect(self) -> None:
+        if not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._client.disconnect(), self._loop).result()
+
+    def emit(self, event: str, data: Optional[Any] = None) -> None:
+        asyncio.run_coroutine_threadsafe(self._client.emit(event, data), self._loop)
+
+    def call(self, event: str, data: Optional[Any] = None, timeout: Optional[float] = 60) -> Any:
+        return asyncio.run_coroutine_threadsafe(
+            self._client.call(event, data, timeout=timeout), self._loop
+        ).result()
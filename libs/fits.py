@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from typing import Union, Optional, Tuple, List
+from datetime import datetime, timezone
+import numpy as np
+import struct
+import zlib
+import gzip
+import cv2
+
+__all__ = [
+    'FITS_BLOCK', 'fits_card', 'fits_header',
+    'observation_date', 'FitsWriter', 'PngWriter',
+    'photo_writer_factory'
+]
+
+FITS_BLOCK = 2880
+_card_length = 80
+# PNG signature and IHDR chunk, text chunks go right after them
+_png_preamble = 8 + 25
+
+# bitpix, stored dtype, bzero
+_pixel_layouts = {
+    np.dtype(np.uint8): (8, np.dtype('u1'), None),
+    np.dtype(np.uint16): (16, np.dtype('>u2'), 32768)
+}
+
+
+def fits_card(
+        keyword: str, value: Union[str, int, float, bool], comment: Optional[str] = None
+    ) -> str:
+    if isinstance(value, bool):
+        value = f'{"T" if value else "F":>20}'
+    elif isinstance(value, (int, np.integer)):
+        value = f'{value:>20}'
+    elif isinstance(value, (float, np.floating)):
+        value = f'{value:>20.10G}'
+    else:
+        value = "'" + str(value).replace("'", "''")[:68].ljust(8) + "'"
+    card = f'{keyword.upper()[:8]:<8}= {value}'
+    if comment:
+        card += f' / {comment}'
+    return card[:_card_length].ljust(_card_length)
+
+
+def fits_header(image: np.ndarray, cards: List[Tuple]) -> bytes:
+    if image.dtype not in _pixel_layouts:
+        raise ValueError(f'Pixel type {image.dtype!r} is not defined')
+    bitpix, _, bzero = _pixel_layouts[image.dtype]
+    # FITS axes are listed fastest first and colour images are stored as planes
+    axes = [image.shape[1], image.shape[0]] + ([image.shape[2]] if image.ndim == 3 else [])
+    lines = [
+        fits_card('SIMPLE', True, 'conforms to FITS standard'),
+        fits_card('BITPIX', bitpix, 'bits per data value'),
+        fits_card('NAXIS', len(axes), 'number of data axes')
+    ]
+    lines += [fits_card(f'NAXIS{index}', axis) for index, axis in enumerate(axes, 1)]
+    if bzero is not None:
+        lines.append(fits_card('BZERO', bzero, 'offset data range to that of unsigned short'))
+        lines.append(fits_card('BSCALE', 1, 'default scaling factor'))
+    lines += [fits_card(*card) for card in cards]
+    lines.append('END'.ljust(_card_length))
+    header = ''.join(lines).encode('ascii', errors='replace')
+    return header.ljust(-(-len(header) // FITS_BLOCK) * FITS_BLOCK, b' ')
+
+
+def observation_date(timestamp: Optional[float] = None) -> str:
+    moment = datetime.now(timezone.utc) if timestamp is None else \
+        datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+
+
+def _planes(image: np.ndarray) -> List[np.ndarray]:
+    if image.ndim == 2:
+        return [image]
+    # frames arrive as BGR, FITS colour planes are ordered RGB
+    return [image[..., channel] for channel in range(image.shape[2] - 1, -1, -1)]
+
+
+def _store(planes: List[np.ndarray], out: np.ndarray) -> None:
+    for plane, target in zip(planes, out):
+        if target.dtype.itemsize == 2:
+            np.bitwise_xor(plane, 0x8000, out=target, casting='unsafe')
+        else:
+            target[...] = plane
+
+
+class FitsWriter:
+
+    extension = '.fits'
+
+    def __init__(self, compress: Optional[bool] = False) -> None:
+        self.compress = compress
+        if compress:
+            self.extension += '.gz'
+
+    def _write_mapped(self, filename: str, header: bytes, image: np.ndarray) -> None:
+        _, dtype, _ = _pixel_layouts[image.dtype]
+        planes = _planes(image)
+        shape = (len(planes), *image.shape[:2])
+        data_size = int(np.prod(shape)) * dtype.itemsize
+        padding = -data_size % FITS_BLOCK
+        with open(filename, 'wb') as file:
+            file.write(header)
+            file.truncate(len(header) + data_size + padding)
+        data = np.memmap(filename, dtype=dtype, mode='r+', offset=len(header), shape=shape)
+        try:
+            _store(planes, data)
+            data.flush()
+        finally:
+            del data
+
+    def _write_compressed(self, filename: str, header: bytes, image: np.ndarray) -> None:
+        _, dtype, _ = _pixel_layouts[image.dtype]
+        planes = _planes(image)
+        buffer = np.empty(image.shape[:2], dtype=dtype)
+        written = 0
+        with gzip.open(filename, 'wb', compresslevel=1) as file:
+            file.write(header)
+            for plane in planes:
+                _store([plane], buffer[np.newaxis])
+                file.write(memoryview(buffer).cast('B'))
+                written += buffer.nbytes
+            file.write(b'\0' * (-written % FITS_BLOCK))
+
+    def write(self, path: str, image: np.ndarray, cards: List[Tuple]) -> str:
+        header = fits_header(image, cards)
+        filename = path + self.extension
+        if self.compress:
+            self._write_compressed(filename, header, image)
+        else:
+            self._write_mapped(filename, header, image)
+        return filename
+
+
+def _png_text_chunk(keyword: str, text: str) -> bytes:
+    body = b'tEXt' + keyword.encode('latin-1')[:79] + b'\0' + text.encode('latin-1', 'replace')
+    return struct.pack('>I', len(body) - 4) + body + struct.pack('>I', zlib.crc32(body))
+
+
+class PngWriter:
+
+    extension = '.png'
+
+    def __init__(self, compression: Optional[int] = 1) -> None:
+        self.compression = compression
+
+    def write(self, path: str, image: np.ndarray, cards: List[Tuple]) -> str:
+        filename = path + self.extension
+        success, buffer = cv2.imencode(
+            self.extension, image, [cv2.IMWRITE_PNG_COMPRESSION, self.compression]
+        )
+        if not success:
+            raise OSError(f'Unable to write {filename!r}')
+        data = memoryview(buffer).cast('B')
+        with open(filename, 'wb') as file:
+            file.write(data[:_png_preamble])
+            file.writelines(_png_text_chunk(card[0], str(card[1])) for card in cards)
+            file.write(data[_png_preamble:])
+        return filename
+
+
+def photo_writer_factory(photo_format: str) -> Union[FitsWriter, PngWriter]:
+    if photo_format == 'fits':
+        return FitsWriter()
+    if photo_format == 'fits.gz':
+        return FitsWriter(compress=True)
+    if photo_format == 'png':
+        return PngWriter()
+    raise ValueError(f'Photo format {photo_format!r} is not defined')
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Tuple
+from threading import Lock
+import numpy as np
+import cv2
+
+__all__ = [
+    'BAYER_PATTERNS', 'superpixel_debayer',
+    'debayer', 'normalize_frame', 'to_uint8',
+    'StretchParameters', 'AutoStretch'
+]
+
+BAYER_PATTERNS = ('RG', 'BG', 'GR', 'GB')
+
+# OpenCV names Bayer conversions after the second row of the mosaic,
+# so an RGGB sensor is converted with COLOR_BayerBG2BGR
+_demosaic_codes = {
+    'RG': cv2.COLOR_BayerBG2BGR,
+    'BG': cv2.COLOR_BayerRG2BGR,
+    'GR': cv2.COLOR_BayerGB2BGR,
+    'GB': cv2.COLOR_BayerGR2BGR
+}
+
+# (red, green, green, blue) offsets inside each 2x2 cell
+_superpixel_offsets = {
+    'RG': ((0, 0), (0, 1), (1, 0), (1, 1)),
+    'BG': ((1, 1), (0, 1), (1, 0), (0, 0)),
+    'GR': ((0, 1), (0, 0), (1, 1), (1, 0)),
+    'GB': ((1, 0), (0, 0), (1, 1), (0, 1))
+}
+
+
+def _cell(mosaic: np.ndarray, offset: Tuple[int, int]) -> np.ndarray:
+    rows, columns = mosaic.shape[0] & ~1, mosaic.shape[1] & ~1
+    return mosaic[offset[0]:rows:2, offset[1]:columns:2]
+
+
+def superpixel_debayer(mosaic: np.ndarray, pattern: str) -> np.ndarray:
+    red, green_a, green_b, blue = (
+        _cell(mosaic, offset) for offset in _superpixel_offsets[pattern]
+    )
+    return cv2.merge([blue, cv2.addWeighted(green_a, 0.5, green_b, 0.5, 0), red])
+
+
+def debayer(mosaic: np.ndarray, pattern: str, superpixel: Optional[bool] = True) -> np.ndarray:
+    if superpixel:
+        return superpixel_debayer(mosaic, pattern)
+    return cv2.cvtColor(mosaic, _demosaic_codes[pattern])
+
+
+def normalize_frame(
+        image: np.ndarray, color_format: str,
+        bayer_pattern: Optional[str] = None,
+        superpixel: Optional[bool] = True
+    ) -> np.ndarray:
+    if color_format in ('RAW8', 'RAW16') and bayer_pattern is not None and image.ndim == 2:
+        return debayer(image, bayer_pattern, superpixel)
+    return image
+
+
+def to_uint8(image: np.ndarray) -> np.ndarray:
+    if image.dtype == np.uint8:
+        return image
+    if image.dtype == np.uint16:
+        return cv2.convertScaleAbs(image, alpha=1 / 256)
+    return cv2.convertScaleAbs(image, alpha=255 / max(float(image.max()), 1e-6))
+
+
+class StretchParameters(NamedTuple):
+    black: float
+    midtone: float
+    median: float
+    mad: float
+
+
+_MIDTONE_EPSILON = 1e-4
+
+
+def _midtones_transfer(midtone: float, value: np.ndarray) -> np.ndarray:
+    # the denominator stays below -epsilon for midtones inside (0, 1) and values in [0, 1]
+    midtone = min(max(midtone, _MIDTONE_EPSILON), 1 - _MIDTONE_EPSILON)
+    return (midtone - 1) * value / ((2 * midtone - 1) * value - midtone)
+
+
+class AutoStretch:
+
+    def __init__(self,
+            target_background: Optional[float] = 0.25,
+            shadows_clipping: Optional[float] = -2.8,
+            subsample: Optional[int] = 8,
+            drift: Optional[float] = 0.5
+        ) -> None:
+        self.target_background = target_background
+        self.shadows_clipping = shadows_clipping
+        self.subsample = subsample
+        self.drift = drift
+        self._lock = Lock()
+        self._lut = None
+        self.parameters = None
+
+    @staticmethod
+    def _histogram_median(histogram: np.ndarray) -> int:
+        cumulative = np.cumsum(histogram)
+        return int(np.searchsorted(cumulative, cumulative[-1] / 2))
+
+    def _statistics(self, image: np.ndarray, levels: int) -> Tuple[float, float]:
+        sample = image[::self.subsample, ::self.subsample].ravel()
+        median = self._histogram_median(np.bincount(sample, minlength=levels))
+        deviations = np.abs(sample.astype(np.int32) - median)
+        mad = self._histogram_median(np.bincount(deviations, minlength=levels))
+        scale = levels - 1
+        return median / scale, max(mad * 1.4826 / scale, 1 / scale)
+
+    def _drifted(self, median: float, mad: float) -> bool:
+        if self._lut is None or self.parameters is None:
+            return True
+        previous = self.parameters
+        return (
+            abs(median - previous.median) > self.drift * previous.mad
+            or abs(mad - previous.mad) > self.drift * previous.mad
+        )
+
+    def _build(self, median: float, mad: float, levels: int) -> np.ndarray:
+        black = min(max(0.0, median + self.shadows_clipping * mad), 0.99)
+        midtone = float(_midtones_transfer(
+            self.target_background, (median - black) / (1 - black)
+        ))
+        midtone = min(max(midtone, _MIDTONE_EPSILON), 1 - _MIDTONE_EPSILON)
+        values = np.linspace(0, 1, levels, dtype=np.float32)
+        values = np.clip((values - black) / (1 - black), 0, 1)
+        self.parameters = StretchParameters(black, midtone, median, mad)
+        return (_midtones_transfer(midtone, values) * 255 + 0.5).astype(np.uint8)
+
+    def apply(self, image: np.ndarray) -> Tuple[np.ndarray, StretchParameters]:
+        levels = 65536 if image.dtype == np.uint16 else 256
+        image = image if levels == 65536 else to_uint8(image)
+        median, mad = self._statistics(image, levels)
+        with self._lock:
+            if self._drifted(median, mad) or len(self._lut) != levels:
+                self._lut = self._build(median, mad, levels)
+            lut, parameters = self._lut, self.parameters
+        if levels == 256:
+            return cv2.LUT(image, lut), parameters
+        return lut[image], parameters
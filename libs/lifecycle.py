@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple, List
+from threading import Thread, Event, Lock, current_thread
+
+__all__ = ['Worker', 'LifecycleManager']
+
+Stop = Callable[[Optional[float]], Optional[bool]]
+
+
+class Worker:
+
+    def __init__(self, target: Callable[[Event], None], name: str) -> None:
+        self.target = target
+        self.name = name
+        self._lock = Lock()
+        self._stopped = Event()
+        self._restart = False
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    @property
+    def stopping(self) -> bool:
+        return self.running and self._stopped.is_set() and not self._restart
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                if not self._stopped.is_set():
+                    raise RuntimeError(f'Worker {self.name!r} is still running')
+                # the previous target is still winding down, run it again once it returns
+                self._stopped = Event()
+                self._restart = True
+                return
+            self._stopped = Event()
+            self._thread = Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopped, restart = self._stopped, True
+        try:
+            while restart:
+                self.target(stopped)
+                with self._lock:
+                    restart, self._restart = self._restart, False
+                    stopped = self._stopped
+                    if not restart:
+                        self._thread = None
+        finally:
+            with self._lock:
+                if self._thread is current_thread():
+                    self._restart = False
+                    self._thread = None
+
+    def stop(self) -> None:
+        with self._lock:
+            self._restart = False
+            self._stopped.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        thread = self._thread
+        if thread is not None and thread is not current_thread():
+            thread.join(timeout)
+        return not self.running
+
+    def stop_and_join(self, timeout: Optional[float] = None) -> bool:
+        self.stop()
+        return self.join(timeout)
+
+
+class LifecycleManager:
+
+    def __init__(self, timeout: Optional[float] = 5.0) -> None:
+        self.timeout = timeout
+        self._lock = Lock()
+        self._components: List[Tuple[str, Optional[Callable[[], None]], Optional[Stop]]] = []
+        self._started: List[str] = []
+
+    def add(self,
+            name: str,
+            start: Optional[Callable[[], None]] = None,
+            stop: Optional[Stop] = None
+        ) -> None:
+        with self._lock:
+            if any(component[0] == name for component in self._components):
+                raise ValueError(f'Component {name!r} is already registered')
+            self._components.append((name, start, stop))
+
+    @property
+    def started(self) -> List[str]:
+        with self._lock:
+            return list(self._started)
+
+    def start(self) -> None:
+        with self._lock:
+            for name, start, _ in self._components:
+                if name in self._started:
+                    continue
+                try:
+                    if start is not None:
+                        start()
+                except BaseException:
+                    self._stop_started()
+                    raise
+                self._started.append(name)
+
+    def stop(self) -> List[str]:
+        with self._lock:
+            return self._stop_started()
+
+    def _stop_started(self) -> List[str]:
+        stops = {name: stop for name, _, stop in self._components}
+        stalled = []
+        while self._started:
+            name = self._started.pop()
+            if stops[name] is None:
+                continue
+            try:
+                stopped = stops[name](self.timeout)
+            except Exception as exception: # pylint: disable=broad-except
+                print(f'[LIFECYCLE] Failed to stop {name!r}: {exception!r}')
+                stopped = False
+            if stopped is False:
+                stalled.append(name)
+        if stalled:
+            print(f'[LIFECYCLE] Components did not stop in time: {", ".join(stalled)}')
+        return stalled
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Union, Tuple, List, Dict, Any
+from threading import Thread, Event, Lock
+from bisect import bisect_left
+import os
+
+__all__ = [
+    'DEFAULT_BUCKETS', 'Counter', 'Histogram',
+    'MetricsRegistry', 'MetricsExporter'
+]
+
+# seconds
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class Counter:
+
+    kind = 'counter'
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.value = 0
+
+    def inc(self, amount: Optional[Union[int, float]] = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Union[int, float]:
+        return self.value
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        return [f'{name}{{{labels}}} {self.value}' if labels else f'{name} {self.value}']
+
+
+class Histogram:
+
+    kind = 'histogram'
+
+    def __init__(self, buckets: Optional[Tuple[float, ...]] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def _read(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+    def _quantile(self, cumulative: List[int], quantile: float) -> Optional[float]:
+        if not cumulative[-1]:
+            return None
+        index = bisect_left(cumulative, quantile * cumulative[-1])
+        return self.buckets[index] if index < len(self.buckets) else float('inf')
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        counts, total = self._read()
+        cumulative = [sum(counts[:index + 1]) for index in range(len(counts))]
+        count = cumulative[-1]
+        return {
+            'count': count, 'sum': total,
+            'mean': total / count if count else None,
+            'p50': self._quantile(cumulative, 0.5),
+            'p95': self._quantile(cumulative, 0.95)
+        }
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        counts, total = self._read()
+        separator = ',' if labels else ''
+        lines, cumulative = [], 0
+        for bound, count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {total}')
+        lines.append(f'{name}_count{suffix} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self, namespace: Optional[str] = 'uniscope') -> None:
+        self.namespace = namespace
+        self._lock = Lock()
+        self._families: Dict[str, Tuple[str, Dict[str, Union[Counter, Histogram]]]] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, str]) -> str:
+        return ','.join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+    def _metric(self,
+            factory: type, name: str, description: str,
+            labels: dict, **options: Any
+        ) -> Union[Counter, Histogram]:
+        name = f'{self.namespace}_{name}' if self.namespace else name
+        key = self._labels(labels)
+        with self._lock:
+            _, metrics = self._families.setdefault(name, (description, {}))
+            if key not in metrics:
+                metrics[key] = factory(**options)
+            return metrics[key]
+
+    def counter(self, name: str, description: str, **labels: str) -> Counter:
+        return self._metric(Counter, name, description, labels)
+
+    def histogram(self,
+            name: str, description: str,
+            buckets: Optional[Tuple[float, ...]] = DEFAULT_BUCKETS, **labels: str
+        ) -> Histogram:
+        return self._metric(Histogram, name, description, labels, buckets=buckets)
+
+    def _items(self) -> List[Tuple[str, str, Dict[str, Union[Counter, Histogram]]]]:
+        with self._lock:
+            return [
+                (name, description, dict(metrics))
+                for name, (description, metrics) in self._families.items()
+            ]
+
+    def snapshot(self) -> Dict[str, Dict[str, Union[int, float, dict]]]:
+        return {
+            name: {labels: metric.snapshot() for labels, metric in metrics.items()}
+            for name, _, metrics in self._items()
+        }
+
+    def prometheus(self) -> str:
+        lines = []
+        for name, description, metrics in self._items():
+            kind = next(iter(metrics.values())).kind
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, metric in metrics.items():
+                lines.extend(metric.samples(name, labels))
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+
+    def __init__(self,
+            registry: MetricsRegistry,
+            path: Optional[str] = None,
+            port: Optional[int] = None,
+            interval: Optional[float] = 10.0,
+            host: Optional[str] = '127.0.0.1'
+        ) -> None:
+        self.registry = registry
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.host = host
+        self._stopped = Event()
+        self._server = None
+
+    def write(self) -> None:
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(self.registry.prometheus())
+        os.replace(temporary, self.path)
+
+    def _write_loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def _handler(self) -> type:
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None: # pylint: disable=invalid-name
+                body = registry.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        if self.path:
+            Thread(target=self._write_loop, name='metrics-file', daemon=True).start()
+        if self.port:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            self._server.daemon_threads = True
+            Thread(
+                target=self._server.serve_forever, name='metrics-http', daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.path:
+            self.write()
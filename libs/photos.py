@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Any
+from threading import Thread, Lock
+from queue import Queue, Full
+from time import monotonic
+
+__all__ = ['PhotoQueue', 'PhotoQueueFullError']
+
+
+class PhotoQueueFullError(RuntimeError):
+    ...
+
+
+class PhotoQueue:
+
+    def __init__(self,
+            capture: Callable[[dict], Any],
+            write: Callable[[dict, Any], str],
+            notify: Callable[[str, dict], None],
+            max_pending: Optional[int] = 4,
+            history: Optional[int] = 32
+        ) -> None:
+        self._capture = capture
+        self._write = write
+        self._notify = notify
+        self.history = history
+        self._captures = Queue(maxsize=max_pending)
+        self._writes = Queue(maxsize=max_pending)
+        self._lock = Lock()
+        self.jobs = {}
+        self._threads = [
+            Thread(target=self._capture_loop, name='photo-capture', daemon=True),
+            Thread(target=self._write_loop, name='photo-writer', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _update(self, job: dict, state: str, **details: Optional[Any]) -> None:
+        finished = state in ('done', 'failed')
+        with self._lock:
+            job.update(state=state, **details)
+            status = dict(job)
+            if finished:
+                self._forget_finished()
+        self._notify('photo_complete' if finished else 'photo_progress', status)
+
+    def _forget_finished(self) -> None:
+        finished = [
+            job_id for job_id, job in self.jobs.items()
+            if job['state'] in ('done', 'failed')
+        ]
+        for job_id in finished[:-self.history]:
+            del self.jobs[job_id]
+
+    def submit(self, job_id: str, options: Optional[dict] = None) -> dict:
+        job = {'job_id': job_id, 'options': options or {}, 'state': 'queued'}
+        status = dict(job)
+        with self._lock:
+            try:
+                self._captures.put_nowait(job)
+            except Full as exception:
+                raise PhotoQueueFullError('Too many photos are waiting for exposure') from exception
+            self.jobs[job_id] = job
+            self._notify('photo_progress', status)
+        return status
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return None if job is None else dict(job)
+
+    def _capture_loop(self) -> None:
+        while True:
+            job = self._captures.get()
+            if job is None:
+                self._writes.put(None)
+                return
+            self._update(job, 'exposing')
+            try:
+                exposure = self._capture(job)
+            except Exception as exception: # pylint: disable=broad-except
+                self._update(job, 'failed', error=repr(exception))
+                continue
+            self._update(job, 'writing')
+            self._writes.put((job, exposure))
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            job, exposure = item
+            try:
+                filename = self._write(job, exposure)
+            except Exception as exception: # pylint: disable=broad-except
+                self._update(job, 'failed', error=repr(exception))
+            else:
+                self._update(job, 'done', filename=filename)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else monotonic() + timeout
+        try:
+            self._captures.put(None, timeout=timeout)
+        except Full:
+            return False
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
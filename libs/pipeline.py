@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple, List, Dict, Any
+from threading import Thread, Condition
+from collections import deque
+from time import monotonic
+from enum import Enum
+
+__all__ = ['OverflowPolicy', 'FramePipeline', 'FrameSlot']
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = 'drop-oldest'
+    DROP_NEWEST = 'drop-newest'
+    BLOCK = 'block'
+
+
+class FramePipeline:
+
+    def __init__(self,
+            handler: Callable[..., None],
+            workers: Optional[int] = 2,
+            maxsize: Optional[int] = 2,
+            policy: Optional[OverflowPolicy] = OverflowPolicy.DROP_OLDEST,
+            on_drop: Optional[Callable[..., None]] = None
+        ) -> None:
+        if workers < 1 or maxsize < 1:
+            raise ValueError('Pipeline needs at least one worker and one queue slot')
+        self.handler = handler
+        self.on_drop = on_drop
+        self.policy = OverflowPolicy(policy)
+        self.maxsize = maxsize
+        self._queue = deque()
+        self._condition = Condition()
+        self._stopped = False
+        self._counters = {
+            'submitted': 0, 'processed': 0, 'failed': 0,
+            'dropped_oldest': 0, 'dropped_newest': 0
+        }
+        self._workers = [
+            Thread(target=self._worker_loop, name=f'frame-pipeline-{index}', daemon=True)
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                args = self._queue.popleft()
+                self._condition.notify_all()
+            try:
+                self.handler(*args)
+            except Exception as exception: # pylint: disable=broad-except
+                self._count('failed')
+                print(f'[PIPELINE] Frame handler failed: {exception!r}')
+            else:
+                self._count('processed')
+
+    def _count(self, counter: str) -> None:
+        with self._condition:
+            self._counters[counter] += 1
+
+    def submit(self, *args: Any) -> bool:
+        dropped = None
+        with self._condition:
+            self._counters['submitted'] += 1
+            if len(self._queue) >= self.maxsize:
+                if self.policy is OverflowPolicy.DROP_NEWEST:
+                    self._counters['dropped_newest'] += 1
+                    dropped = args
+                elif self.policy is OverflowPolicy.DROP_OLDEST:
+                    dropped = self._queue.popleft()
+                    self._counters['dropped_oldest'] += 1
+                else:
+                    while len(self._queue) >= self.maxsize:
+                        self._condition.wait()
+            if dropped is not args:
+                self._queue.append(args)
+                self._condition.notify_all()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(*dropped)
+        return dropped is not args
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            self._stopped = True
+            dropped = list(self._queue)
+            self._queue.clear()
+            self._condition.notify_all()
+        if self.on_drop is not None:
+            for args in dropped:
+                self.on_drop(*args)
+        deadline = None if timeout is None else monotonic() + timeout
+        for worker in self._workers:
+            worker.join(None if deadline is None else max(0.0, deadline - monotonic()))
+        return not any(worker.is_alive() for worker in self._workers)
+
+    @property
+    def dropped(self) -> int:
+        with self._condition:
+            return self._counters['dropped_oldest'] + self._counters['dropped_newest']
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {**self._counters, 'queued': len(self._queue)}
+
+    @staticmethod
+    def parse_policy(value: str) -> OverflowPolicy:
+        try:
+            return OverflowPolicy(value.strip().lower())
+        except ValueError as exception:
+            policies: List[str] = [policy.value for policy in OverflowPolicy]
+            raise ValueError(
+                f'Overflow policy {value!r} is not defined, use one of {policies}'
+            ) from exception
+
+
+class FrameSlot:
+
+    def __init__(self) -> None:
+        self._condition = Condition()
+        self._seq = 0
+        self._frame = None
+
+    @property
+    def seq(self) -> int:
+        with self._condition:
+            return self._seq
+
+    def publish(self, seq: int, frame: dict) -> bool:
+        with self._condition:
+            if seq <= self._seq:
+                return False
+            self._seq, self._frame = seq, frame
+            self._condition.notify_all()
+        return True
+
+    def latest(self) -> Tuple[int, Optional[dict]]:
+        with self._condition:
+            return self._seq, self._frame
+
+    def wait_newer(self,
+            seq: int, timeout: Optional[float] = None
+        ) -> Optional[Tuple[int, dict]]:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._seq > seq, timeout):
+                return None
+            return self._seq, self._frame
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from threading import Thread, Lock, get_ident, enumerate as avalable_threads
+from typing import Callable, Optional, Counter as CounterType, List
+from collections import Counter
+from time import monotonic, sleep
+from types import FrameType
+import sys
+import os
+
+__all__ = ['SamplingProfiler', 'collapse_stack']
+
+
+def _frame_label(frame: FrameType) -> str:
+    path = frame.f_code.co_filename
+    filename = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+    return f'{frame.f_code.co_name} ({filename}:{frame.f_lineno})'
+
+
+def collapse_stack(thread_name: str, frame: Optional[FrameType]) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+
+    def __init__(self, interval: Optional[float] = 0.005) -> None:
+        self.interval = interval
+        self._lock = Lock()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self,
+            duration: float, path: str,
+            on_complete: Optional[Callable[[str, int], None]] = None
+        ) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = Thread(
+                target=self._sample_loop, args=(duration, path, on_complete),
+                name='sampling-profiler', daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def _sample_loop(self,
+            duration: float, path: str,
+            on_complete: Optional[Callable[[str, int], None]]
+        ) -> None:
+        stacks: CounterType[str] = Counter()
+        samples = 0
+        own = get_ident()
+        deadline = monotonic() + duration
+        while monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in avalable_threads()}
+            for ident, frame in sys._current_frames().items(): # pylint: disable=protected-access
+                if ident != own:
+                    stacks[collapse_stack(names.get(ident, str(ident)), frame)] += 1
+            samples += 1
+            sleep(self.interval)
+        self._write(path, stacks)
+        if on_complete is not None:
+            on_complete(path, samples)
+
+    @staticmethod
+    def _write(path: str, stacks: CounterType[str]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines: List[str] = [f'{stack} {count}' for stack, count in stacks.most_common()]
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Tuple
+from threading import Lock
+from time import monotonic
+
+__all__ = ['StreamSettings', 'QualityController']
+
+
+class StreamSettings(NamedTuple):
+    width: int
+    height: int
+    quality: int
+
+
+class QualityController:
+
+    def __init__(self,
+            max_size: Tuple[int, int], quality: int,
+            quality_bounds: Optional[Tuple[int, int]] = (30, 90),
+            min_scale: Optional[float] = 0.25,
+            target_fps: Optional[float] = 10.0,
+            target_bitrate: Optional[float] = 4e6,
+            adaptive: Optional[bool] = True,
+            quality_step: Optional[int] = 5,
+            scale_step: Optional[float] = 0.85,
+            adjust_period: Optional[float] = 1.0,
+            smoothing: Optional[float] = 0.2,
+            quality_sensitive: Optional[bool] = True
+        ) -> None:
+        self.max_size = max_size
+        self.quality_bounds = quality_bounds
+        self.min_scale = min_scale
+        self.target_fps = target_fps
+        self.target_bitrate = target_bitrate
+        self.adaptive = adaptive
+        self.quality_step = quality_step
+        self.scale_step = scale_step
+        self.adjust_period = adjust_period
+        self.smoothing = smoothing
+        self.quality_sensitive = quality_sensitive
+        self._lock = Lock()
+        self._scale = 1.0
+        self._quality = min(max(quality, quality_bounds[0]), quality_bounds[1])
+        self._encode_time = None
+        self._encoded_size = None
+        self._request_interval = None
+        self._last_request = None
+        self._last_response = None
+        self._last_adjust = monotonic()
+        self._settings = self._make_settings()
+
+    def _average(self, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return average + self.smoothing * (value - average)
+
+    def _make_settings(self) -> StreamSettings:
+        width = max(16, int(self.max_size[0] * self._scale) & ~1)
+        height = max(16, int(self.max_size[1] * self._scale) & ~1)
+        return StreamSettings(width, height, self._quality)
+
+    def settings(self) -> StreamSettings:
+        return self._settings
+
+    def record_encode(self, seconds: float, size: int) -> None:
+        with self._lock:
+            self._encode_time = self._average(self._encode_time, seconds)
+            self._encoded_size = self._average(self._encoded_size, size)
+            self._adjust()
+
+    def record_response(self) -> None:
+        with self._lock:
+            self._last_response = monotonic()
+
+    def record_request(self) -> None:
+        now = monotonic()
+        with self._lock:
+            # only the time the consumer took since the last frame, exposures do not count
+            if self._last_response is not None:
+                self._request_interval = self._average(
+                    self._request_interval, now - self._last_response
+                )
+                self._last_response = None
+            self._last_request = now
+
+    def _adjust(self) -> None:
+        now = monotonic()
+        if not self.adaptive or now - self._last_adjust < self.adjust_period:
+            return
+        self._last_adjust = now
+        time_ratio = self._encode_time * self.target_fps
+        size_ratio = self._encoded_size * 8 * self.target_fps / self.target_bitrate
+        fps_ratio = 0.0
+        if self._request_interval is not None and now - self._last_request < 5 * self.adjust_period:
+            fps_ratio = self._request_interval * self.target_fps
+        if time_ratio > 1.1:
+            self._scale_down()
+        elif max(size_ratio, fps_ratio) > 1.1:
+            if self.quality_sensitive and self._quality > self.quality_bounds[0]:
+                self._quality = max(self.quality_bounds[0], self._quality - self.quality_step)
+            else:
+                self._scale_down()
+        elif max(time_ratio, size_ratio, fps_ratio) < 0.75:
+            if self._scale < 1.0:
+                self._scale = min(1.0, self._scale / self.scale_step)
+            elif self.quality_sensitive:
+                self._quality = min(self.quality_bounds[1], self._quality + self.quality_step)
+        self._settings = self._make_settings()
+
+    def _scale_down(self) -> None:
+        self._scale = max(self.min_scale, self._scale * self.scale_step)
+
+    def report(self) -> dict:
+        return {
+            **self._settings._asdict(),
+            'encode_ms': None if self._encode_time is None else self._encode_time * 1e3,
+            'bytes': None if self._encoded_size is None else int(self._encoded_size)
+        }
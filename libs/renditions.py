@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Callable, NamedTuple, Optional, Tuple, List, Dict
+from threading import Lock
+from time import monotonic
+import numpy as np
+
+__all__ = ['Rendition', 'parse_renditions', 'RenditionSet']
+
+
+class Rendition(NamedTuple):
+    name: str
+    width: int
+    height: int
+
+
+def parse_renditions(value: str) -> List[Rendition]:
+    renditions = []
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        try:
+            name, size = item.split(':')
+            width, height = map(int, size.lower().split('x'))
+        except ValueError:
+            raise ValueError(f'Rendition {item!r} is not defined') from None
+        renditions.append(Rendition(name.strip(), width, height))
+    return sorted(renditions, key=lambda rendition: -rendition.width)
+
+
+class RenditionSet:
+
+    def __init__(self,
+            renditions: List[Rendition],
+            idle_timeout: Optional[float] = 10.0
+        ) -> None:
+        self.renditions = renditions
+        self.idle_timeout = idle_timeout
+        self._lock = Lock()
+        self._requested: Dict[str, float] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return [rendition.name for rendition in self.renditions]
+
+    def request(self, name: str) -> None:
+        if name not in self.names:
+            raise ValueError(f'Rendition {name!r} is not defined')
+        with self._lock:
+            self._requested[name] = monotonic()
+
+    def active(self) -> List[Rendition]:
+        deadline = monotonic() - self.idle_timeout
+        with self._lock:
+            requested = dict(self._requested)
+        return [
+            rendition for rendition in self.renditions
+            if requested.get(rendition.name, deadline) > deadline
+        ]
+
+    def pyramid(self,
+            image: np.ndarray,
+            resize: Callable[[np.ndarray, Tuple[int, int], str], np.ndarray]
+        ) -> List[Tuple[Rendition, np.ndarray]]:
+        levels = []
+        for rendition in self.active():
+            if rendition.width >= image.shape[1] or rendition.height >= image.shape[0]:
+                continue
+            # each level starts from the previous, larger one instead of the full frame
+            image = resize(image, (rendition.width, rendition.height), rendition.name)
+            levels.append((rendition, image))
+        return levels
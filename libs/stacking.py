@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+from threading import Lock
+import numpy as np
+import cv2
+
+__all__ = ['LiveStacker']
+
+
+class LiveStacker:
+
+    def __init__(self,
+            registration_scale: Optional[float] = 0.25,
+            sigma: Optional[float] = 3.0,
+            clipping_after: Optional[int] = 3,
+            min_response: Optional[float] = 0.05
+        ) -> None:
+        self.registration_scale = registration_scale
+        self.sigma = sigma
+        self.clipping_after = clipping_after
+        self.min_response = min_response
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reference = None
+            self._window = None
+            self._shape = None
+            self._mean = None
+            self._m2 = None
+            self._count = None
+            self.frames = 0
+            self.rejected = 0
+
+    def _registration_image(self, image: np.ndarray) -> np.ndarray:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(
+            image, None, fx=self.registration_scale, fy=self.registration_scale,
+            interpolation=cv2.INTER_AREA
+        )
+        return small.astype(np.float32)
+
+    def _start(self, image: np.ndarray, small: np.ndarray) -> None:
+        self._reference = small
+        self._window = cv2.createHanningWindow(small.shape[::-1], cv2.CV_32F)
+        self._shape = image.shape
+        self._mean = image.astype(np.float32).reshape(image.shape[0], -1)
+        self._m2 = np.zeros_like(self._mean)
+        self._count = np.ones_like(self._mean)
+        self.frames = 1
+
+    def _register(self, image: np.ndarray, small: np.ndarray) -> Optional[np.ndarray]:
+        (shift_x, shift_y), response = cv2.phaseCorrelate(self._reference, small, self._window)
+        if response < self.min_response:
+            return None
+        translation = np.float32([
+            [1, 0, -shift_x / self.registration_scale],
+            [0, 1, -shift_y / self.registration_scale]
+        ])
+        return cv2.warpAffine(
+            image.astype(np.float32), translation, image.shape[1::-1],
+            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE
+        )
+
+    def _accumulate(self, aligned: np.ndarray) -> None:
+        aligned = aligned.reshape(self._mean.shape)
+        accepted = None
+        if self.frames >= self.clipping_after:
+            deviation = cv2.sqrt(cv2.divide(self._m2, self._count))
+            threshold = cv2.addWeighted(deviation, self.sigma, deviation, 0, 1.0)
+            accepted = cv2.compare(cv2.absdiff(aligned, self._mean), threshold, cv2.CMP_LE)
+        delta = cv2.subtract(aligned, self._mean)
+        cv2.add(self._count, 1.0, dst=self._count, mask=accepted)
+        cv2.add(self._mean, cv2.divide(delta, self._count), dst=self._mean, mask=accepted)
+        cv2.multiply(delta, cv2.subtract(aligned, self._mean), dst=delta)
+        cv2.add(self._m2, delta, dst=self._m2, mask=accepted)
+
+    def add(self, image: np.ndarray) -> Tuple[np.ndarray, dict]:
+        small = self._registration_image(image)
+        with self._lock:
+            if self._mean is None or self._shape != image.shape:
+                self._start(image, small)
+            else:
+                aligned = self._register(image, small)
+                if aligned is None:
+                    self.rejected += 1
+                else:
+                    self._accumulate(aligned)
+                    self.frames += 1
+            stacked = self._mean.reshape(self._shape).astype(image.dtype)
+            info = {'frames': self.frames, 'rejected': self.rejected}
+        return stacked, info
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+import numpy as np
+import cv2
+
+__all__ = ['StarField']
+
+
+class StarField:
+
+    image_types = ('RGB24', 'RAW8', 'RAW16', 'Y8')
+
+    def __init__(self,
+            width: int, height: int,
+            image_type: Optional[str] = 'RGB24',
+            seed: Optional[int] = 0,
+            ring_size: Optional[int] = 8,
+            stars: Optional[int] = None,
+            background: Optional[float] = 0.03,
+            noise: Optional[float] = 0.008,
+            seeing: Optional[float] = 1.2
+        ) -> None:
+        if image_type not in self.image_types:
+            raise ValueError(f'Image type {image_type!r} is not defined')
+        self.width, self.height = width, height
+        self.image_type = image_type
+        rng = np.random.default_rng(seed)
+        if stars is None:
+            stars = width * height // 2000
+        sky = self._render_sky(rng, stars, seeing)
+        self._ring = [
+            self._quantize(self._expose(rng, sky, background, noise))
+            for _ in range(ring_size)
+        ]
+
+    def _render_sky(self, rng: np.random.Generator, stars: int, seeing: float) -> np.ndarray:
+        sky = np.zeros((self.height, self.width, 3), dtype=np.float32)
+        rows = rng.integers(0, self.height, stars)
+        columns = rng.integers(0, self.width, stars)
+        peak = rng.pareto(1.5, stars).astype(np.float32) * 0.05 + 0.02
+        tint = rng.uniform(0.6, 1.0, (stars, 3)).astype(np.float32)
+        flux = peak[:, None] * tint * np.float32(2 * np.pi * seeing ** 2)
+        for channel in range(3):
+            np.add.at(sky[..., channel], (rows, columns), flux[:, channel])
+        return cv2.GaussianBlur(sky, (0, 0), seeing)
+
+    def _expose(self,
+            rng: np.random.Generator, sky: np.ndarray,
+            background: float, noise: float
+        ) -> np.ndarray:
+        frame = rng.standard_normal(sky.shape, dtype=np.float32)
+        frame *= noise
+        frame += sky
+        frame += background
+        return np.clip(frame, 0, 1, out=frame)
+
+    def _quantize(self, frame: np.ndarray) -> np.ndarray:
+        if self.image_type == 'RGB24':
+            return (frame[..., ::-1] * 255).astype(np.uint8)
+        if self.image_type == 'Y8':
+            return (frame.mean(axis=2) * 255).astype(np.uint8)
+        mosaic = np.empty((self.height, self.width), dtype=np.float32)
+        mosaic[0::2, 0::2] = frame[0::2, 0::2, 0]
+        mosaic[0::2, 1::2] = frame[0::2, 1::2, 1]
+        mosaic[1::2, 0::2] = frame[1::2, 0::2, 1]
+        mosaic[1::2, 1::2] = frame[1::2, 1::2, 2]
+        if self.image_type == 'RAW8':
+            return (mosaic * 255).astype(np.uint8)
+        return (mosaic * 65535).astype(np.uint16)
+
+    def frame(self, index: int, offset: Optional[Tuple[int, int]] = (0, 0)) -> np.ndarray:
+        image = self._ring[index % len(self._ring)]
+        rows, columns = offset[0] % self.height, offset[1] % self.width
+        if self.image_type.startswith('RAW'):
+            rows, columns = rows & ~1, columns & ~1
+        if rows == 0 and columns == 0:
+            return image
+        return np.roll(image, (rows, columns), axis=(0, 1))
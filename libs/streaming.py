@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple
+from threading import Thread, Condition
+
+libs = __import__('sys').modules['libs'] # import ..libs
+
+__all__ = ['CreditStreamer']
+
+
+class CreditStreamer:
+
+    def __init__(self,
+            slot: libs.pipeline.FrameSlot,
+            send: Callable[[int, dict], Optional[bool]],
+            max_credits: Optional[int] = 16,
+            poll: Optional[float] = 0.5
+        ) -> None:
+        self._slot = slot
+        self._send = send
+        self.max_credits = max_credits
+        self.poll = poll
+        self._condition = Condition()
+        self._credits = 0
+        self._active = False
+        self._sent_seq = 0
+        self._thread = None
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @property
+    def credits(self) -> int:
+        return self._credits
+
+    def start(self, credits: int, after: Optional[int] = None) -> int:
+        with self._condition:
+            self._credits = max(0, min(int(credits), self.max_credits))
+            if after is None:
+                seq = self._slot.seq
+                after = seq - 1 if seq else 0
+            self._sent_seq = after
+            self._active = True
+            if self._thread is None:
+                self._thread = Thread(target=self._push_loop, name='frame-push', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+            return self._credits
+
+    def grant(self, credits: Optional[int] = 1) -> int:
+        with self._condition:
+            self._credits = min(self._credits + int(credits), self.max_credits)
+            self._condition.notify_all()
+            return self._credits
+
+    def stop(self) -> None:
+        with self._condition:
+            self._active = False
+            self._credits = 0
+            self._condition.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return thread is None or not thread.is_alive()
+
+    def _take(self) -> Optional[Tuple[int, dict]]:
+        with self._condition:
+            self._condition.wait_for(lambda: not self._active or self._credits > 0)
+            if not self._active:
+                return None
+            after = self._sent_seq
+        newer = self._slot.wait_newer(after, timeout=self.poll)
+        if newer is None:
+            return newer
+        with self._condition:
+            if not self._active or self._credits <= 0 or self._sent_seq != after:
+                return None
+            self._credits -= 1
+            self._sent_seq = newer[0]
+        return newer
+
+    def _push_loop(self) -> None:
+        while True:
+            newer = self._take()
+            if newer is not None:
+                try:
+                    sent = self._send(*newer)
+                except Exception as exception: # pylint: disable=broad-except
+                    print(f'[STREAM] Frame push failed: {exception!r}')
+                    continue
+                if sent is False:
+                    # the frame was skipped, keep the credit for the next one
+                    self.grant(1)
+                continue
+            with self._condition:
+                if not self._active:
+                    self._thread = None
+                    return
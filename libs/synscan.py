@@ -1,19 +1,19 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from serial.tools.list_ports import comports as _avalable_ports
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Union, Tuple, List
-from threading import Thread, main_thread
-from itertools import groupby
+from typing import Callable, Optional, Union, FrozenSet, Tuple, List, Dict
+from threading import Thread, Event, RLock
+from itertools import groupby, count
 from serial import Serial
-from time import sleep
-from enum import Enum
-
-utils = __import__('sys').modules['utils'] # import ..utils
+from queue import PriorityQueue
+from time import monotonic
+from enum import Enum, IntEnum
 
 
 __all__ = [
-    'TrackMode', 'SynScanGetter', 'SynScanObject',
+    'TrackMode', 'CommandPriority', 'SynScanGetter', 'SynScanObject',
     'SynScanNotAvailableError', 'SynScanExecutor',
     'SynScanCommander', 'SynScanFormatter',
     # 'SynScanDEPRECATED'
@@ -26,6 +26,28 @@ class TrackMode(Enum):
     EQATORIAL = 2
     PEC = 3
 
+class CommandPriority(IntEnum):
+    SAFETY = 0
+    MOTION = 1
+    TELEMETRY = 2
+    HOUSEKEEPING = 3
+
+_command_priorities = {
+    'M': CommandPriority.SAFETY,
+    **{command: CommandPriority.MOTION for command in 'PrRbBsST'},
+    **{command: CommandPriority.HOUSEKEEPING for command in 'KVmwhWH'}
+}
+
+_all_axes = frozenset('\x10\x11')
+
+def _motion_axes(command: str) -> FrozenSet[str]:
+    # passthrough commands address a single motor, gotos and their cancel move both
+    if command[0] == 'P' and len(command) > 2:
+        return frozenset(command[2])
+    if command[0] in 'MrRbB':
+        return _all_axes
+    return frozenset()
+
 def _reveal_digits(string: str) -> List[int]:
     return [int(''.join(x[1])) for x in groupby(string, key=str.isdigit) if x[0]]
 
@@ -36,58 +58,119 @@ class SynScanExecutor:
 
     def __init__(self,
             port: str, baudrate: Optional[int] = 9600,
-            timeout: Optional[Union[int, float]] = 0.01
+            timeout: Optional[Union[int, float]] = 0.01,
+            response_timeout: Optional[Union[int, float]] = 1,
+            command_timeout: Optional[Union[int, float]] = 5
         ) -> None:
         self.port = port
         self.timeout = timeout
-        self.commands = {}
-        self.cid = 0
-        Thread(target=self.command_loop, daemon=True).start()
-        self.serial_tunnel = Serial(self.port, baudrate=baudrate, timeout=self.timeout)
+        self.response_timeout = response_timeout
+        self.command_timeout = command_timeout
+        self.commands = PriorityQueue()
+        self._order = count()
+        self._lock = RLock()
+        self._motion: Dict[Future, FrozenSet[str]] = {}
+        self._closed = Event()
+        self.failed = Event()
+        self.failure = None
+        self.on_failure: Optional[Callable[[SynScanNotAvailableError], None]] = None
+        self.serial_tunnel = self._open_serial(baudrate)
+        self._command_thread = Thread(
+            target=self.command_loop, name='synscan-commands', daemon=True
+        )
+        self._command_thread.start()
 
-    def command_loop(self) -> None:
-        try:
-            while True:
-                if self.commands:
-                    for cid in sorted(self.commands):
-                        try:
-                            if not self.commands[cid]['done']:
-                                min_cid = cid
-                                break
-                        except KeyError:
-                            pass
-                    else:
-                        continue
-                    command = self.commands[min_cid]['command'].encode() + b'\r'
-                    result = self._execute(command)
-                    self.commands[min_cid]['result'] = result
-                    self.commands[min_cid]['done'] = True
-                else:
-                    sleep(self.timeout)
-        except: #pylint: disable=bare-except
-            self._stop_all_hardend()
+    def _open_serial(self, baudrate: int) -> Serial:
+        return Serial(self.port, baudrate=baudrate, timeout=self.timeout)
 
-    @staticmethod
-    def _stop_all_hardend() -> None:
-        utils.kill_thread(
-            thread=main_thread(),
-            exception=SynScanNotAvailableError
-            )
-        raise SynScanNotAvailableError
+    def command_loop(self) -> None:
+        while True:
+            *_, command, future = self.commands.get()
+            if command is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = self._execute(command.encode('latin-1') + b'\r')
+            except Exception as exception: # pylint: disable=broad-except
+                future.set_exception(SynScanNotAvailableError(exception))
+                self._fail(exception)
+                break
+            future.set_result(result.decode('latin-1')[:-1])
+        self._fail_pending_commands()
+
+    def _fail_pending_commands(self) -> None:
+        while not self.commands.empty():
+            *_, future = self.commands.get_nowait()
+            if future.set_running_or_notify_cancel():
+                future.set_exception(SynScanNotAvailableError(self.port))
+
+    def _fail(self, exception: BaseException) -> None:
+        with self._lock:
+            if self._closed.is_set() or self.failed.is_set():
+                return
+            self.failure = SynScanNotAvailableError(f'{self.port}: {exception!r}')
+            self.failed.set()
+        self._fail_pending_commands()
+        if self.on_failure is not None:
+            self.on_failure(self.failure)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            self._closed.set()
+            self.commands.put((CommandPriority.HOUSEKEEPING, next(self._order), None, None))
+        self._command_thread.join(timeout)
+        if self._command_thread.is_alive():
+            return False
+        self.serial_tunnel.close()
+        return True
 
     def _execute(self, command: bytes) -> bytes:
         self.serial_tunnel.write(command)
-        return self.serial_tunnel.read_until('#')
-
-    def execute(self, command: str) -> str:
-        self.cid += 1
-        current_cid = self.cid
-        self.commands[current_cid] = {'command': command, 'done': False}
-        while not self.commands[current_cid]['done']:
-            sleep(self.timeout)
-        result = self.commands[current_cid]['result']
-        del self.commands[current_cid]
-        return result.decode()[:-1]
+        deadline = monotonic() + self.response_timeout
+        response = self.serial_tunnel.read_until(b'#')
+        while not response.endswith(b'#'):
+            if monotonic() > deadline:
+                raise SynScanNotAvailableError(f'No response to {command!r}')
+            response += self.serial_tunnel.read_until(b'#')
+        return response
+
+    def submit(self,
+            command: str, priority: Optional[CommandPriority] = None
+        ) -> Future:
+        if priority is None:
+            priority = _command_priorities.get(command[0], CommandPriority.TELEMETRY)
+        future = Future()
+        axes = _motion_axes(command)
+        with self._lock:
+            # checked under the lock so nothing is queued after the loop drained the queue
+            if self.failed.is_set() or self._closed.is_set():
+                future.set_exception(self.failure or SynScanNotAvailableError(self.port))
+                return future
+            if priority == CommandPriority.SAFETY:
+                # a stop jumps the queue, so motion queued before it must not run after it
+                for pending in [pending for pending, moves in self._motion.items() if moves & axes]:
+                    pending.cancel()
+            elif priority == CommandPriority.MOTION and axes:
+                self._motion[future] = axes
+                future.add_done_callback(self._forget_motion)
+            self.commands.put((priority, next(self._order), command, future))
+        return future
+
+    def _forget_motion(self, future: Future) -> None:
+        with self._lock:
+            self._motion.pop(future, None)
+
+    def execute(self,
+            command: str, timeout: Optional[float] = None,
+            priority: Optional[CommandPriority] = None
+        ) -> str:
+        future = self.submit(command, priority)
+        try:
+            return future.result(self.command_timeout if timeout is None else timeout)
+        except FutureTimeoutError as exception:
+            future.cancel()
+            raise SynScanNotAvailableError(f'No result for {command!r}') from exception
 
     def _echo(self, message: str) -> str:
         return self.execute('K' + message)
@@ -106,8 +189,8 @@ class SynScanFormatter:
     @staticmethod
     def _encode_coordinate(coordinate: Tuple[float, float], precise: bool) -> str:
         if precise:
-            return ','.join(hex(int(coord * 16777216))[2:].upper() + '00' for coord in coordinate)
-        return ','.join(hex(int(coord * 65536))[2:].upper() for coord in coordinate)
+            return ','.join(f'{int(coord * 16777216) & 0xFFFFFF:06X}00' for coord in coordinate)
+        return ','.join(f'{int(coord * 65536) & 0xFFFF:04X}' for coord in coordinate)
 
     @staticmethod
     def _format_clock(value: float) -> str:
@@ -203,7 +286,7 @@ class SynScanGetter(SynScanExecutor, SynScanFormatter):
         return location
 
     def get_version(self) -> str:
-        version = map(lambda x: int(x, base=16), self.execute('V'))
+        version = list(map(lambda x: int(x, base=16), self.execute('V')))
         return self.format_version(version)
 
     def get_model(self) -> str:
@@ -219,17 +302,25 @@ class SynScanGetter(SynScanExecutor, SynScanFormatter):
 
 class SynScanCommander(SynScanExecutor, SynScanFormatter):
 
-    def slew_positive_ra(self, speed: int) -> str:
-        return self.execute(f'P\x02\x10${speed:c}\x00\x00\x00')
+    def slew_positive_ra(self,
+            speed: int, priority: Optional[CommandPriority] = None
+        ) -> str:
+        return self.execute(f'P\x02\x10${speed:c}\x00\x00\x00', priority=priority)
 
-    def slew_negative_ra(self, speed: int) -> str:
-        return self.execute(f'P\x02\x10%{speed:c}\x00\x00\x00')
+    def slew_negative_ra(self,
+            speed: int, priority: Optional[CommandPriority] = None
+        ) -> str:
+        return self.execute(f'P\x02\x10%{abs(speed):c}\x00\x00\x00', priority=priority)
 
-    def slew_positive_dec(self, speed: int) -> str:
-        return self.execute(f'P\x02\x11${speed:c}\x00\x00\x00')
+    def slew_positive_dec(self,
+            speed: int, priority: Optional[CommandPriority] = None
+        ) -> str:
+        return self.execute(f'P\x02\x11${speed:c}\x00\x00\x00', priority=priority)
 
-    def slew_negative_dec(self, speed: int) -> str:
-        return self.execute(f'P\x02\x11%{speed:c}\x00\x00\x00')
+    def slew_negative_dec(self,
+            speed: int, priority: Optional[CommandPriority] = None
+        ) -> str:
+        return self.execute(f'P\x02\x11%{abs(speed):c}\x00\x00\x00', priority=priority)
 
     def is_alignment_complete(self) -> bool:
         return self.execute('J') == '\x01'
@@ -249,33 +340,43 @@ class SynScanObject(SynScanCommander, SynScanGetter):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        Thread(target=self._ping_pong_loop).start()
+        self._watchdog = Thread(
+            target=self._ping_pong_loop, name='synscan-watchdog', daemon=True
+        )
+        self._watchdog.start()
 
     def _ping_pong_loop(self,
             timeout: Optional[Union[int, float]] = 1,
             delay: Optional[Union[int, float]] = 10
         ) -> None:
-        while True:
-            thread = Thread(target=self._echo, args=('ping',))
-            thread.start()
-            sleep(timeout)
-            if thread.is_alive():
-                self._stop_all_hardend()
-            sleep(delay)
-
-    def slew_ra(self, speed: int) -> str:
+        while not self._closed.is_set():
+            try:
+                self.submit('Kping', CommandPriority.HOUSEKEEPING).result(timeout)
+            except (FutureTimeoutError, SynScanNotAvailableError) as exception:
+                self._fail(exception)
+                return
+            self._closed.wait(delay)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        closed = super().close(timeout)
+        self._watchdog.join(timeout)
+        return closed and not self._watchdog.is_alive()
+
+    def slew_ra(self, speed: int, priority: Optional[CommandPriority] = None) -> str:
         if speed >= 0:
-            return self.slew_positive_ra(speed)
-        return self.slew_negative_ra(speed)
+            return self.slew_positive_ra(speed, priority)
+        return self.slew_negative_ra(speed, priority)
 
-    def slew_dec(self, speed: int) -> str:
+    def slew_dec(self, speed: int, priority: Optional[CommandPriority] = None) -> str:
         if speed >= 0:
-            return self.slew_positive_dec(speed)
-        return self.slew_negative_dec(speed)
+            return self.slew_positive_dec(speed, priority)
+        return self.slew_negative_dec(speed, priority)
 
     def stop_slew(self) -> None:
-        self.slew_ra(0)
-        self.slew_dec(0)
+        stop_ra = self.submit('P\x02\x10$\x00\x00\x00\x00', CommandPriority.SAFETY)
+        stop_dec = self.submit('P\x02\x11$\x00\x00\x00\x00', CommandPriority.SAFETY)
+        stop_ra.result()
+        stop_dec.result()
 
     @staticmethod
     def get_avalable_ports() -> List[str]:
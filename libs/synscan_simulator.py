@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple, Dict, List
+from threading import Thread, Lock
+from time import monotonic, sleep
+from datetime import datetime
+import os
+
+libs = __import__('sys').modules['libs'] # import ..libs
+
+__all__ = ['SIDEREAL_RATE', 'SLEW_RATES', 'MountState', 'SynScanSimulator']
+
+# turns per second
+SIDEREAL_RATE = 1 / 86164.0905
+SLEW_RATES = [
+    0, SIDEREAL_RATE, 2 * SIDEREAL_RATE, 8 * SIDEREAL_RATE, 16 * SIDEREAL_RATE,
+    32 * SIDEREAL_RATE, 64 * SIDEREAL_RATE, 1 / 360, 2 / 360, 4 / 360
+]
+_axes = {16: 0, 17: 1}
+_directions = {ord('$'): 1, ord('%'): -1}
+
+
+def _wrapped_delta(value: float) -> float:
+    return (value + 0.5) % 1 - 0.5
+
+
+class MountState:
+
+    def __init__(self,
+            ra: Optional[float] = 0.0, dec: Optional[float] = 0.0,
+            goto_rate: Optional[float] = 4 / 360
+        ) -> None:
+        self.position = [ra, dec]
+        self.rates = [0.0, 0.0]
+        self.target = None
+        self.goto_rate = goto_rate
+        self.tracking = libs.synscan.TrackMode.OFF
+        self.location = [55, 45, 7, 0, 37, 37, 6, 1]
+        self._clock = monotonic()
+
+    def advance(self) -> None:
+        now = monotonic()
+        elapsed, self._clock = now - self._clock, now
+        if self.target is not None:
+            arrived = True
+            for axis in (0, 1):
+                delta = _wrapped_delta(self.target[axis] - self.position[axis])
+                step = self.goto_rate * elapsed
+                if abs(delta) > step:
+                    delta, arrived = step if delta > 0 else -step, False
+                self.position[axis] = (self.position[axis] + delta) % 1
+            if arrived:
+                self.target = None
+            return
+        for axis in (0, 1):
+            self.position[axis] = (self.position[axis] + self.rates[axis] * elapsed) % 1
+
+    def slew(self, axis: int, direction: int, speed: int) -> None:
+        self.target = None
+        self.rates[axis] = direction * SLEW_RATES[min(speed, len(SLEW_RATES) - 1)]
+
+    def goto(self, ra: float, dec: float) -> None:
+        self.rates = [0.0, 0.0]
+        self.target = (ra, dec)
+
+    def sync(self, ra: float, dec: float) -> None:
+        self.position = [ra, dec]
+
+
+class SynScanSimulator:
+
+    def __init__(self,
+            latency: Optional[float] = 0.0,
+            baudrate: Optional[int] = 9600,
+            emulate_baudrate: Optional[bool] = True,
+            command_latency: Optional[Dict[str, float]] = None,
+            state: Optional[MountState] = None
+        ) -> None:
+        self.latency = latency
+        self.baudrate = baudrate
+        self.emulate_baudrate = emulate_baudrate
+        self.command_latency = command_latency or {}
+        self.state = state or MountState()
+        self.commands = 0
+        self._lock = Lock()
+        self._master = None
+        self._slave = None
+        self.port = None
+
+    def start(self) -> str:
+        import tty # pylint: disable=import-outside-toplevel # unix only
+        self._master, slave = os.openpty()
+        tty.setraw(slave)
+        self._slave = slave
+        self.port = os.ttyname(slave)
+        Thread(target=self._serve_loop, name='synscan-simulator', daemon=True).start()
+        return self.port
+
+    def _serve_loop(self) -> None:
+        pending = b''
+        while True:
+            try:
+                pending += os.read(self._master, 256)
+            except OSError:
+                return
+            while b'\r' in pending:
+                command, pending = pending.split(b'\r', 1)
+                started = monotonic()
+                response = self.handle(command.decode('latin-1')).encode('latin-1') + b'#'
+                delay = self.command_latency.get(command[:1].decode('latin-1'), self.latency)
+                if self.emulate_baudrate:
+                    # 8N1 framing, ten bit times per byte in both directions
+                    delay += (len(command) + 1 + len(response)) * 10 / self.baudrate
+                sleep(max(0.0, delay - (monotonic() - started)))
+                os.write(self._master, response)
+
+    def _coordinates(self, precise: bool) -> str:
+        return libs.synscan.SynScanFormatter._encode_coordinate( # pylint: disable=protected-access
+            self.state.position, precise=precise
+        )
+
+    @staticmethod
+    def _parse_coordinates(argument: str) -> Tuple[float, float]:
+        return libs.synscan.SynScanFormatter._decode_coordinate(argument) # pylint: disable=protected-access
+
+    def _slew(self, argument: str) -> str:
+        data = [ord(char) for char in argument]
+        if len(data) >= 4 and data[0] == 2 and data[1] in _axes and data[2] in _directions:
+            self.state.slew(_axes[data[1]], _directions[data[2]], data[3])
+        return ''
+
+    @staticmethod
+    def _now() -> List[int]:
+        now = datetime.now()
+        return [now.hour, now.minute, now.second, now.month, now.day, now.year - 2000, 0, 0]
+
+    def handle(self, command: str) -> str:
+        with self._lock:
+            self.commands += 1
+            self.state.advance()
+            name, argument = command[:1], command[1:]
+            if name in ('e', 'z'):
+                return self._coordinates(precise=True)
+            if name in ('E', 'Z'):
+                return self._coordinates(precise=False)
+            if name in ('r', 'R', 'b', 'B'):
+                self.state.goto(*self._parse_coordinates(argument))
+                return ''
+            if name in ('s', 'S'):
+                self.state.sync(*self._parse_coordinates(argument))
+                return ''
+            if name == 'P':
+                return self._slew(argument)
+            if name == 'M':
+                self.state.target = None
+                return ''
+            if name == 'L':
+                return '1' if self.state.target is not None else '0'
+            if name == 'J':
+                return '\x01'
+            if name == 'K':
+                return argument[:1]
+            if name == 't':
+                return chr(self.state.tracking.value)
+            if name == 'T':
+                self.state.tracking = libs.synscan.TrackMode(ord(argument[:1]))
+                return ''
+            if name == 'V':
+                return '042507'
+            if name == 'm':
+                return '\x00'
+            if name == 'p':
+                return 'W' if self.state.position[1] <= 0.5 else 'E'
+            if name == 'w':
+                return ''.join(map(chr, self.state.location))
+            if name == 'W':
+                self.state.location = [ord(char) for char in argument[:8]]
+                return ''
+            if name == 'h':
+                return ''.join(map(chr, self._now()))
+            return ''
+
+    def close(self) -> None:
+        for descriptor in (self._master, self._slave):
+            if descriptor is not None:
+                os.close(descriptor)
+        self._master = self._slave = None
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+from threading import Lock
+import numpy as np
+import cv2
+
+__all__ = ['TileDeltaEncoder']
+
+
+class TileDeltaEncoder:
+
+    def __init__(self,
+            tile_size: Optional[int] = 64,
+            pixel_threshold: Optional[int] = 24,
+            min_changed_pixels: Optional[int] = 4,
+            keyframe_interval: Optional[int] = 50
+        ) -> None:
+        self.tile_size = tile_size
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.keyframe_interval = keyframe_interval
+        self._lock = Lock()
+        self._reference = None
+        self._reference_id = 0
+        self._since_keyframe = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reference = None
+            self._reference_id += 1
+
+    def _changed_tiles(self, image: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        difference = cv2.absdiff(image, reference)
+        if difference.ndim == 3:
+            difference = difference.max(axis=2)
+        changed = (difference > self.pixel_threshold).view(np.uint8)
+        rows = -(-changed.shape[0] // self.tile_size)
+        columns = -(-changed.shape[1] // self.tile_size)
+        changed = cv2.copyMakeBorder(
+            changed, 0, rows * self.tile_size - changed.shape[0],
+            0, columns * self.tile_size - changed.shape[1], cv2.BORDER_CONSTANT
+        )
+        counts = changed.reshape(
+            rows, self.tile_size, columns, self.tile_size
+        ).sum(axis=(1, 3), dtype=np.uint32)
+        return np.argwhere(counts >= self.min_changed_pixels)
+
+    def encode(self, image: np.ndarray, encode: Callable[[np.ndarray], bytes]) -> dict:
+        with self._lock:
+            reference, base = self._reference, self._reference_id
+            keyframe = (
+                reference is None or reference.shape != image.shape
+                or self._since_keyframe >= self.keyframe_interval
+            )
+        if keyframe:
+            return {
+                'keyframe': True, 'data': encode(image), 'tiles': [],
+                '_base': base, '_state': image
+            }
+        state, tiles = reference.copy(), []
+        for row, column in self._changed_tiles(image, reference):
+            top, left = row * self.tile_size, column * self.tile_size
+            tile = image[top:top + self.tile_size, left:left + self.tile_size]
+            state[top:top + self.tile_size, left:left + self.tile_size] = tile
+            tiles.append({
+                'x': int(left), 'y': int(top),
+                'width': tile.shape[1], 'height': tile.shape[0],
+                'data': encode(tile)
+            })
+        return {
+            'keyframe': False, 'data': None, 'tiles': tiles,
+            '_base': base, '_state': state
+        }
+
+    def acknowledge(self, delta: dict) -> bool:
+        with self._lock:
+            if delta['_base'] != self._reference_id:
+                return False
+            self._reference = delta['_state']
+            self._reference_id += 1
+            self._since_keyframe = 0 if delta['keyframe'] else self._since_keyframe + 1
+        return True
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple, Dict
+from time import perf_counter, monotonic, time
+from collections import deque
+from threading import Lock
+
+__all__ = ['TraceClock', 'ClockOffsetEstimator', 'LatencySummary']
+
+
+class TraceClock:
+
+    def __init__(self) -> None:
+        # perf_counter is monotonic but has no epoch, anchor it to wall time once
+        self._epoch = time() - perf_counter()
+
+    def now(self) -> float:
+        return perf_counter()
+
+    def to_epoch_ms(self, value: float) -> float:
+        return round((self._epoch + value) * 1e3, 3)
+
+    def now_ms(self) -> float:
+        return self.to_epoch_ms(perf_counter())
+
+
+class ClockOffsetEstimator:
+
+    def __init__(self, samples: Optional[int] = 8) -> None:
+        self._lock = Lock()
+        self._samples = deque(maxlen=samples)
+
+    def add(self, sent: float, server: float, received: float) -> Tuple[float, float]:
+        rtt = received - sent
+        offset = server - (sent + received) / 2
+        with self._lock:
+            self._samples.append((rtt, offset))
+        return offset, rtt
+
+    def _best(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            return min(self._samples, default=None)
+
+    @property
+    def offset(self) -> Optional[float]:
+        best = self._best()
+        return None if best is None else best[1]
+
+    @property
+    def rtt(self) -> Optional[float]:
+        best = self._best()
+        return None if best is None else best[0]
+
+    def to_local(self, server_time: float) -> Optional[float]:
+        offset = self.offset
+        return None if offset is None else server_time - offset
+
+
+class LatencySummary:
+
+    def __init__(self, window: Optional[int] = 512, interval: Optional[float] = 60.0) -> None:
+        self.interval = interval
+        self._lock = Lock()
+        self._values = deque(maxlen=window)
+        self._reported = monotonic()
+
+    def add(self, value: float) -> None:
+        with self._lock:
+            self._values.append(value)
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            ordered = sorted(self._values)
+        if not ordered:
+            return {'count': 0, 'p50': None, 'p95': None, 'p99': None}
+        def pick(percent: float) -> float:
+            return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+        return {'count': len(ordered), 'p50': pick(50), 'p95': pick(95), 'p99': pick(99)}
+
+    def report_due(self) -> bool:
+        now = monotonic()
+        with self._lock:
+            if not self._values or now - self._reported < self.interval:
+                return False
+            self._reported = now
+        return True
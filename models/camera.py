@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-from requests import get as http_get
-from typing import Type
+from typing import Type, Tuple, Optional, Any
+from threading import Event, Lock
 from time import sleep
-from io import BytesIO
-from PIL import Image
 import numpy as np
 import zwoasi
-import cv2
 
 interfaces = __import__('sys').modules['interfaces'] # import ..interfaces
+models = __import__('sys').modules['models'] # import ..models
 utils = __import__('sys').modules['utils'] # import ..utils
 libs = __import__('sys').modules['libs'] # import ..libs
 
@@ -22,52 +20,91 @@ __all__ = [
 class BaseCamera(interfaces.camera.CameraInterface):
 
     def __init__(self) -> None:
-        self._changed = False
-        self._running = False
+        self._changed = Event()
+        self._running = Event()
         self._camera = None
+        self.name = type(self).__name__
+        self.parameters = {}
+        self.color_format = 'RGB24'
+        self.bayer_pattern = None
+
+    @property
+    def image_format(self) -> Tuple[str, Optional[str]]:
+        return self.color_format, self.bayer_pattern
 
     def _update_paramerers(self) -> None:
-        self._changed = True
+        self._changed.set()
+
+    def wait_configured(self, timeout: Optional[float] = None) -> bool:
+        return self._changed.wait(timeout)
 
     def capture_video_frame(self) -> None:
-        while not self._running:
-            sleep(0.1)
+        self._running.wait()
 
     def start_video_capture(self) -> None:
-        while not self._changed:
-            sleep(0.1)
+        self._changed.wait()
         self._start_video_capture()
-        self._running = True
+        self._running.set()
 
     def stop_video_capture(self) -> None:
-        self._running = False
+        self._running.clear()
 
-    def capture(self, filename: str) -> None:
-        self.stop_video_capture()
-        self._capture(self, filename)
-        self.start_video_capture()
+    def release_video_frame(self, image: np.ndarray) -> None:
+        pass
+
+    def capture(self) -> np.ndarray:
+        streaming = self._running.is_set()
+        if streaming:
+            self.stop_video_capture()
+        try:
+            return self._capture()
+        finally:
+            if streaming:
+                self.start_video_capture()
 
 
 class MockCamera(BaseCamera):
 
-    def __init__(self):
+    def __init__(self,
+            mount: Optional[models.mount.BaseMount] = None,
+            **kwargs: Optional[Any]
+        ) -> None:
         super().__init__()
         self._mock_delay = 0
-
-    @staticmethod
-    def _get_random_image() -> np.ndarray:
-        width, height = utils.get_kwargs_or_dotenv_values(
-            variables=['WEBP_IMAGE_WIDTH', 'WEBP_IMAGE_HEIGHT']
+        self._mount = mount
+        self._frame_index = 0
+        self._frame_lock = Lock()
+        width, height, seed, ring_size, pixels_per_degree = utils.config.values(
+            variables=[
+                'MOCK_CAMERA_WIDTH', 'MOCK_CAMERA_HEIGHT', 'MOCK_CAMERA_SEED',
+                'MOCK_CAMERA_RING_SIZE', 'MOCK_CAMERA_PIXELS_PER_DEGREE'
+            ], kwargs=kwargs
         )
-        raw = http_get(f'https://picsum.photos/{width}/{height}').content
-        image = cv2.cvtColor(np.array(Image.open(BytesIO(raw))), cv2.COLOR_BGR2RGB)
-        return image
+        self._starfield_options = {
+            'width': width, 'height': height,
+            'seed': seed, 'ring_size': ring_size
+        }
+        self._pixels_per_turn = pixels_per_degree * 360
+        self._starfield = libs.starfield.StarField(**self._starfield_options)
+        self.color_format = self._starfield.image_type
+        self.bayer_pattern = 'RG'
+
+    def _drift_offset(self) -> Tuple[int, int]:
+        if self._mount is None:
+            return 0, 0
+        ra, dec = self._mount.get_ra_dec()
+        return int(dec * self._pixels_per_turn), int(ra * self._pixels_per_turn)
+
+    def _next_frame_index(self) -> int:
+        with self._frame_lock:
+            self._frame_index += 1
+            return self._frame_index
 
     def capture_video_frame(self) -> np.ndarray:
         print('[CAMERA] Called `capture_video_frame` method')
         super().capture_video_frame()
         sleep(self._mock_delay)
-        return self._get_random_image()
+        return self._starfield.frame(self._next_frame_index(), self._drift_offset())
 
     @staticmethod
     def _start_video_capture() -> None:
@@ -82,33 +119,69 @@ class MockCamera(BaseCamera):
             '[CAMERA] Called `update_paramerers` method ' \
             'with args ' + utils.json_stringify(parameters)
         )
+        self.parameters = dict(parameters)
         self._mock_delay = parameters['exposition'] * 0.000001
+        image_type = parameters.get('colorFormat', self._starfield.image_type)
+        if image_type != self._starfield.image_type:
+            self._starfield = libs.starfield.StarField(
+                image_type=image_type, **self._starfield_options
+            )
+            self.color_format = image_type
         super()._update_paramerers()
 
-    def _capture(self, filename: str) -> None:
-        print(
-            '[CAMERA] Called `capture` method ' \
-            'with args ' + utils.json_stringify(filename)
-        )
+    def _capture(self) -> np.ndarray:
+        print('[CAMERA] Called `capture` method')
         sleep(self._mock_delay)
+        return self._starfield.frame(self._next_frame_index(), self._drift_offset()).copy()
 
 
 class RealCamera(BaseCamera):
 
-    def __init__(self, camera_id: int) -> None:
+    _image_layouts = {
+        zwoasi.ASI_IMG_RAW8: (np.uint8, ()),
+        zwoasi.ASI_IMG_Y8: (np.uint8, ()),
+        zwoasi.ASI_IMG_RAW16: (np.uint16, ()),
+        zwoasi.ASI_IMG_RGB24: (np.uint8, (3,))
+    }
+
+    def __init__(self, camera_id: int, buffers: Optional[int] = 6) -> None:
         super().__init__()
         self._camera = zwoasi.Camera(camera_id)
+        self._buffer_count = buffers
+        self._buffers = None
+        properties = self._camera.get_camera_property()
+        self.name = properties['Name']
+        if properties['IsColorCam']:
+            self.bayer_pattern = libs.imaging.BAYER_PATTERNS[properties['BayerPattern']]
+
+    def _allocate_buffers(self) -> None:
+        width, height, _, image_type = self._camera.get_roi_format()
+        dtype, channels = self._image_layouts[image_type]
+        shape = (height, width, *channels)
+        if self._buffers is None or not self._buffers.matches(shape, dtype):
+            self._buffers = libs.buffers.FrameBufferPool(shape, dtype, self._buffer_count)
 
     def capture_video_frame(self) -> np.ndarray:
         super().capture_video_frame()
-        return self._camera.capture_video_frame()
+        buffers = self._buffers
+        image = buffers.acquire()
+        try:
+            self._camera.get_video_data(buffer_=buffers.buffer(image))
+        except: # pylint: disable=bare-except
+            buffers.release(image)
+            raise
+        return image
+
+    def release_video_frame(self, image: np.ndarray) -> None:
+        self._buffers.release(image)
 
     def _start_video_capture(self) -> None:
+        self._allocate_buffers()
         self._camera.start_video_capture()
 
     def stop_video_capture(self) -> None:
-        self._camera.start_video_capture()
-        super().start_video_capture()
+        super().stop_video_capture()
+        self._camera.stop_video_capture()
 
     def update_paramerers(self, data: dict) -> None:
         self._camera.set_control_value(zwoasi.ASI_BRIGHTNESS, data['brightness'])
@@ -126,13 +199,20 @@ class RealCamera(BaseCamera):
             'Y8': zwoasi.ASI_IMG_Y8
         }[data['colorFormat']]
         self._camera.set_image_type(color_format)
+        self.color_format = data['colorFormat']
+        self.parameters = dict(data)
+        self._allocate_buffers()
         super()._update_paramerers()
 
-    def _capture(self, filename: str) -> None:
-        self._camera.capture(filename=filename)
+    def _capture(self) -> np.ndarray:
+        return self._camera.capture()
 
 
-def camera_factory(workmode: str) -> Type[BaseCamera]:
+def camera_factory(
+        workmode: str,
+        mount: Optional[models.mount.BaseMount] = None,
+        **kwargs: Optional[Any]
+    ) -> Type[BaseCamera]:
     if workmode == 'real':
         utils.init_zwoasi_drivers()
         cameras = zwoasi.list_cameras()
@@ -142,9 +222,10 @@ def camera_factory(workmode: str) -> Type[BaseCamera]:
             camera_id = cameras[0]
         else:
             camera_id = libs.pynquirer.select('selct camera', cameras)
-        camera = RealCamera(camera_id=camera_id)
-    elif workmode == 'mock':
-        camera = MockCamera()
+        buffers = utils.config.get('CAMERA_BUFFERS', kwargs=kwargs)
+        camera = RealCamera(camera_id=camera_id, buffers=buffers)
+    elif workmode in ('mock', 'simulator'):
+        camera = MockCamera(mount=mount, **kwargs)
     else:
         raise ValueError(f'Workmode {workmode!r} is not defined')
     return camera
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Type, Tuple
+from concurrent.futures import CancelledError
+from typing import Type, Tuple, Callable, NamedTuple, Optional, Any
+from threading import Thread, Condition, Event
+from time import time, monotonic
 from math import sin, cos
-from time import time
 
 
 interfaces = __import__('sys').modules['interfaces'] # import ..interfaces
@@ -10,8 +12,9 @@ utils = __import__('sys').modules['utils'] # import ..utils
 libs = __import__('sys').modules['libs'] # import ..libs
 
 __all__ = [
-    'BaseMount', 'MockMount',
-    'RealMount', 'mount_factory'
+    'BaseMount', 'MockMount', 'RealMount',
+    'CoordinateSample', 'CoordinateService',
+    'mount_factory'
 ]
 
 BaseMount = interfaces.mount.MountInterface
@@ -19,6 +22,8 @@ BaseMount = interfaces.mount.MountInterface
 
 class MockMount(BaseMount):
 
+    on_failure = None
+
     @staticmethod
     def start_slew(data: dict) -> None:
         print(
@@ -35,6 +40,13 @@ class MockMount(BaseMount):
         delta_t = time() * 0.00002
         return sin(delta_t) ** 2, cos(delta_t) ** 2
 
+    def get_coordinate_sample(self) -> CoordinateSample:
+        print('[MOUNT] Called `get_coordinate_sample` method')
+        return CoordinateSample(*self._random_ra_dec(), time(), False)
+
+    def get_ra_dec(self) -> Tuple[float, float]:
+        return self._random_ra_dec()
+
     def get_coordinates(self) -> Tuple[str, str]:
         print('[MOUNT] Called `get_coordinates` method')
         coordinates = self._random_ra_dec()
@@ -47,34 +59,164 @@ class MockMount(BaseMount):
             'with args ' + utils.json_stringify(data)
         )
 
+    @staticmethod
+    def close(timeout: Optional[float] = None) -> bool:
+        print(
+            '[MOUNT] Called `close` method ' \
+            'with args ' + utils.json_stringify({'timeout': timeout})
+        )
+        return True
+
+
+class CoordinateSample(NamedTuple):
+    ra: float
+    dec: float
+    timestamp: float
+    extrapolated: bool
+
+
+def _wrapped_delta(value: float) -> float:
+    return (value + 0.5) % 1 - 0.5
+
+
+class CoordinateService:
+
+    def __init__(self,
+            poll: Callable[[], Tuple[float, float]],
+            rate: Optional[float] = 4.0,
+            timeout: Optional[float] = 5.0
+        ) -> None:
+        self._poll = poll
+        self._interval = 1 / rate
+        self._timeout = timeout
+        self._condition = Condition()
+        self._wake = Event()
+        self._stopped = Event()
+        self._sample = None
+        self._velocity = None
+        self._thread = Thread(target=self._poll_loop, name='mount-poll', daemon=True)
+        self._thread.start()
+
+    def _poll_loop(self) -> None:
+        while not self._stopped.is_set():
+            started = monotonic()
+            try:
+                ra, dec = self._poll()
+            except Exception as exception: # pylint: disable=broad-except
+                print(f'[MOUNT] Coordinate poll failed: {exception!r}')
+            else:
+                self._update(ra, dec, time(), monotonic())
+            self._wake.wait(max(0, self._interval - (monotonic() - started)))
+            self._wake.clear()
+
+    def _update(self, ra: float, dec: float, timestamp: float, clock: float) -> None:
+        with self._condition:
+            previous = self._sample
+            if previous is not None and self._velocity is not None:
+                elapsed = clock - previous[3]
+                self._velocity = (
+                    _wrapped_delta(ra - previous[0]) / elapsed,
+                    _wrapped_delta(dec - previous[1]) / elapsed
+                )
+            else:
+                self._velocity = (0.0, 0.0)
+            self._sample = (ra, dec, timestamp, clock)
+            self._condition.notify_all()
+
+    def reset_motion(self) -> None:
+        with self._condition:
+            self._velocity = None
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def get(self) -> CoordinateSample:
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._sample is not None, self._timeout):
+                raise libs.synscan.SynScanNotAvailableError(
+                    f'No coordinates within {self._timeout}s'
+                )
+            ra, dec, timestamp, clock = self._sample
+            velocity = self._velocity
+        elapsed = min(monotonic() - clock, 2 * self._interval)
+        if not velocity or velocity == (0.0, 0.0) or elapsed <= 0:
+            return CoordinateSample(ra, dec, timestamp, False)
+        return CoordinateSample(
+            (ra + velocity[0] * elapsed) % 1, (dec + velocity[1] * elapsed) % 1,
+            timestamp + elapsed, True
+        )
+
 
 class RealMount(BaseMount):
 
-    def __init__(self, com_port: str) -> None:
+    def __init__(self, com_port: str, poll_rate: Optional[float] = 4.0) -> None:
+        self._on_failure = None
         self._mount = libs.synscan.SynScanObject(com_port)
+        self._mount.on_failure = self._handle_failure
+        self._coordinates = CoordinateService(self._mount.get_ra_dec, rate=poll_rate)
+
+    @property
+    def on_failure(self) -> Optional[Callable[[Exception], None]]:
+        return self._on_failure
+
+    @on_failure.setter
+    def on_failure(self, callback: Optional[Callable[[Exception], None]]) -> None:
+        self._on_failure = callback
+        # the watchdog starts pinging before anyone can subscribe, replay an early failure
+        if callback is not None and self._mount.failed.is_set():
+            callback(self._mount.failure)
+
+    def _handle_failure(self, exception: libs.synscan.SynScanNotAvailableError) -> None:
+        print(f'[MOUNT] Mount is not available: {exception}')
+        if self._on_failure is not None:
+            self._on_failure(exception)
 
     def start_slew(self, data: dict) -> None:
         assert data['speed'] in [-7, -2, 2, 7]
-        if data['direction'] == 'RA':
-            self._mount.slew_ra(data['speed'])
-        else:
-            self._mount.slew_dec(data['speed'])
+        try:
+            if data['direction'] == 'RA':
+                self._mount.slew_ra(data['speed'])
+            else:
+                self._mount.slew_dec(data['speed'])
+        except CancelledError:
+            print('[MOUNT] Slew was superseded by a stop')
+        self._coordinates.reset_motion()
 
     def stop_slew(self) -> None:
         self._mount.stop_slew()
+        self._coordinates.reset_motion()
+
+    def get_coordinate_sample(self) -> CoordinateSample:
+        return self._coordinates.get()
+
+    def get_ra_dec(self) -> Tuple[float, float]:
+        sample = self._coordinates.get()
+        return sample.ra, sample.dec
 
     def get_coordinates(self) -> Tuple[str, str]:
-        numeric_ra, numeric_dec = self._mount.get_ra_dec()
-        return self._mount.format_ra_dec(numeric_ra, numeric_dec)
+        sample = self._coordinates.get()
+        return self._mount.format_ra_dec(sample.ra, sample.dec)
 
     def goto_coordinates(self, data: dict) -> None:
         ra, dec = self._mount.parse_ra_dec(data['ra'], data['dec'])
-        self._mount.goto_ra_dec(ra, dec)
+        try:
+            self._mount.goto_ra_dec(ra, dec)
+        except CancelledError:
+            print('[MOUNT] Goto was superseded by a cancel')
+        self._coordinates.reset_motion()
 
+    def close(self, timeout: Optional[float] = None) -> bool:
+        polling_stopped = self._coordinates.stop(timeout)
+        return self._mount.close(timeout) and polling_stopped
 
 
-def mount_factory(workmode: str) -> Type[BaseMount]:
+def mount_factory(workmode: str, **kwargs: Optional[Any]) -> Type[BaseMount]:
     if workmode == 'real':
+        poll_rate = utils.config.get('MOUNT_POLL_RATE', kwargs=kwargs)
         ports = libs.synscan.SynScanObject.get_avalable_ports()
         if len(ports) == 0:
             raise SystemError('No telescope found')
@@ -82,7 +224,18 @@ def mount_factory(workmode: str) -> Type[BaseMount]:
             mount = ports[0]
         else:
             mount = libs.pynquirer.select('selct port', ports)
-        mount = RealMount(com_port=mount)
+        mount = RealMount(com_port=mount, poll_rate=poll_rate)
+    elif workmode == 'simulator':
+        poll_rate, latency, baudrate = utils.config.values(
+            variables=[
+                'MOUNT_POLL_RATE', 'SYNSCAN_SIMULATOR_LATENCY',
+                'SYNSCAN_SIMULATOR_BAUDRATE'
+            ], kwargs=kwargs
+        )
+        simulator = libs.synscan_simulator.SynScanSimulator(
+            latency=latency, baudrate=baudrate
+        )
+        mount = RealMount(com_port=simulator.start(), poll_rate=poll_rate)
     elif workmode == 'mock':
         mount = MockMount()
     else:
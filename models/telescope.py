@@ -1,26 +1,35 @@
 from __future__ import annotations
 
-from typing import Any, Type, Optional
-from threading import Thread
-from socketio import Client
-from time import sleep
+from typing import Any, Type, Tuple, Optional, List, Union, Callable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, local
+from collections import OrderedDict
+from socketio import Client, AsyncClient, exceptions as socketio_exceptions
+from time import perf_counter, strftime
 from time import time
 import numpy as np
+import asyncio
+import signal
 import cv2
 import os
 
 interfaces = __import__('sys').modules['interfaces'] # import ..interfaces
+libs = __import__('sys').modules['libs'] # import ..libs
 models = __import__('sys').modules['models'] # import ..models
 utils = __import__('sys').modules['utils'] # import ..utils
 
 __all__ = [
-    'BaseTelescope', 'MockTelescope',
-    'RealTelescope', 'telescope_factory'
+    'BaseTelescope', 'MockTelescope', 'RealTelescope',
+    'AsyncTelescope', 'telescope_factory'
 ]
 
+_bayer_names = {'RG': 'RGGB', 'BG': 'BGGR', 'GR': 'GRBG', 'GB': 'GBRG'}
+
 
 class BaseTelescope(interfaces.telescope.TelescopeInterface):
 
+    max_capture_failures = 5
+
     def __init__(self,
             telescope_id: str,
             server: dict,
@@ -30,75 +39,563 @@ class BaseTelescope(interfaces.telescope.TelescopeInterface):
         ) -> None:
         self.telescope_id = telescope_id
         self.server = server
-        self._frame = {'sent': None, 'last': None}
+        self._frame = libs.pipeline.FrameSlot()
+        self._sent_seq = 0
         self.camera = camera
         self.mount = mount
-        self.hardware_thread = None
+        self._hardware = libs.lifecycle.Worker(self._hardware_loop, 'hardware-loop')
+        self._video_lock = Lock()
+        self._photo_exposing = False
+        self._video_requested = False
+        self._shutdown = Event()
+        self._failure = None
+        self.mount.on_failure = self._request_shutdown
         self.load_constants(**kwargs)
-
-    def _hardware_loop(self) -> None:
-        while True:
-            image = self.camera.capture_video_frame()
-            coordinates = self.mount.get_coordinates()
-            Thread(target=self._process_image, args=(
-                image, coordinates
-            ), daemon=True).start()
+        self._resize_buffers = local()
+        self._metrics = libs.metrics.MetricsRegistry()
+        self._stage_seconds = {
+            stage: self._metrics.histogram(
+                'stage_seconds', 'Latency of each frame pipeline stage', stage=stage
+            ) for stage in (
+                'capture', 'get_coordinates', 'queue_wait', 'normalize', 'resize',
+                'stack', 'stretch', 'encode', 'renditions', 'get_frame_wait'
+            )
+        }
+        self._frames_total = {
+            event: self._metrics.counter(
+                'frames_total', 'Frames by pipeline event', event=event
+            ) for event in ('captured', 'processed', 'dropped', 'sent')
+        }
+        self._latency_seconds = {
+            span: self._metrics.histogram(
+                'frame_latency_seconds', 'Frame age since exposure end', span=span
+            ) for span in ('capture_to_send', 'capture_to_display')
+        }
+        self._clock = libs.tracing.TraceClock()
+        self._clock_offset = libs.tracing.ClockOffsetEstimator()
+        self._clock_sync = libs.lifecycle.Worker(self._clock_sync_loop, 'clock-sync')
+        self._sent_traces = OrderedDict()
+        self._traces_lock = Lock()
+        self._latency = {
+            span: libs.tracing.LatencySummary(interval=self._latency_log_interval)
+            for span in ('capture_to_send', 'capture_to_display')
+        }
+        self._profiler = libs.profiler.SamplingProfiler(interval=self._profile_interval)
+        self._metrics_exporter = libs.metrics.MetricsExporter(
+            self._metrics, path=self._metrics_file, port=self._metrics_port,
+            interval=self._metrics_interval
+        )
+        self.photos = libs.photos.PhotoQueue(
+            capture=self._capture_photo, write=self._write_photo,
+            notify=self._emit
+        )
+        self.pipeline = libs.pipeline.FramePipeline(
+            self._process_image, workers=self._pipeline_workers,
+            maxsize=self._pipeline_queue_size, policy=self._pipeline_policy,
+            on_drop=self._drop_frame
+        )
+        self._lifecycle = libs.lifecycle.LifecycleManager(timeout=self._stop_timeout)
+        self._lifecycle.add(
+            'metrics', start=self._metrics_exporter.start,
+            stop=lambda _: self._metrics_exporter.stop()
+        )
+        self._lifecycle.add('mount', stop=self.mount.close)
+        self._lifecycle.add('photos', stop=self.photos.close)
+        self._lifecycle.add('pipeline', stop=self.pipeline.stop)
+        self._lifecycle.add('video', stop=self._stop_video_capture)
+
+    def _hardware_loop(self, stopped: Event) -> None:
+        # settings may never arrive, so the wait for them has to notice a stop
+        while not self.camera.wait_configured(0.1):
+            if stopped.is_set():
+                return
+        try:
+            self.camera.start_video_capture()
+        except Exception as exception: # pylint: disable=broad-except
+            print(f'[HARDEND] Video capture failed to start: {exception!r}')
+            return
+        try:
+            self._capture_frames(stopped)
+        finally:
+            self.camera.stop_video_capture()
+
+    def _capture_frames(self, stopped: Event) -> None:
+        seq = self._frame.seq
+        failures = 0
+        while not stopped.is_set():
+            started = perf_counter()
+            try:
+                image = self.camera.capture_video_frame()
+            except Exception as exception: # pylint: disable=broad-except
+                if stopped.is_set():
+                    return
+                failures += 1
+                print(f'[HARDEND] Video frame capture failed: {exception!r}')
+                if failures >= self.max_capture_failures:
+                    self._request_shutdown(exception)
+                    return
+                stopped.wait(0.1)
+                continue
+            failures = 0
+            captured = perf_counter()
+            try:
+                sample = self.mount.get_coordinate_sample()
+            except libs.synscan.SynScanNotAvailableError as exception:
+                self._release_frame(image)
+                self._request_shutdown(exception)
+                return
+            submitted = perf_counter()
+            self._stage_seconds['capture'].observe(captured - started)
+            self._stage_seconds['get_coordinates'].observe(submitted - captured)
+            self._frames_total['captured'].inc()
+            seq += 1
+            trace = {'exposure_end': captured, 'coordinates': submitted}
+            ra, dec = libs.synscan.SynScanFormatter.format_ra_dec(sample.ra, sample.dec)
+            position = {
+                'ra': ra, 'dec': dec,
+                'timestamp': sample.timestamp, 'extrapolated': sample.extrapolated
+            }
+            self.pipeline.submit(image, position, seq, self.camera.image_format, trace)
 
     def _start_video_capture(self) -> None:
-        self.camera.start_video_capture()
-        self.hardware_thread = Thread(target=self._hardware_loop, daemon=True)
-        self.hardware_thread.start()
+        with self._video_lock:
+            self._hardware.start()
 
-    def _stop_video_capture(self) -> None:
-        self.camera.stop_video_capture()
-        utils.kill_thread(thread=self.hardware_thread)
-        self.hardware_thread = None
+    def _stop_video_capture(self, timeout: Optional[float] = None) -> bool:
+        with self._video_lock:
+            self._video_requested = False
+            self._hardware.stop()
+            self.camera.stop_video_capture()
+        return self._hardware.join(self._stop_timeout if timeout is None else timeout)
+
+    def _request_shutdown(self, exception: Optional[BaseException] = None) -> None:
+        if self._failure is None:
+            self._failure = exception
+        self._shutdown.set()
 
     def load_constants(self, **kwargs: Optional[Any]) -> None:
         self._path = os.path.join(os.path.expanduser("~"), "Desktop", "Uniscope_photos")
-        width, height, quality = utils.get_kwargs_or_dotenv_values(
+        width, height, quality = utils.config.values(
             variables=[
                 'WEBP_IMAGE_WIDTH', 'WEBP_IMAGE_HEIGHT',
                 'WEBP_IMAGE_QUALITY'
             ], kwargs=kwargs
         )
-        self._webp_size = int(width), int(height)
-        self._quality = [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
-
-    def _process_image(self, raw_image: np.ndarray, position: dict) -> None:
-        resized_image = cv2.resize(raw_image, self._webp_size)
-        _, buffer = cv2.imencode('.webp', resized_image, self._quality)
-        final_image = buffer.tobytes()
-        self._frame['last'] = {'data': final_image, 'position': position}
+        self._webp_size = width, height
+        self._default_codec = utils.config.get('PREVIEW_CODEC', kwargs=kwargs)
+        debayer = utils.config.get('PREVIEW_DEBAYER', kwargs=kwargs)
+        if debayer not in ('superpixel', 'full'):
+            raise ValueError(f'Debayer mode {debayer!r} is not defined')
+        self._superpixel = debayer == 'superpixel'
+        stretch, target_background, shadows_clipping = utils.config.values(
+            variables=[
+                'PREVIEW_AUTO_STRETCH', 'PREVIEW_STRETCH_BACKGROUND',
+                'PREVIEW_STRETCH_SHADOWS'
+            ], kwargs=kwargs
+        )
+        self._stretch_enabled = stretch
+        live_stack, stack_sigma, registration_scale = utils.config.values(
+            variables=[
+                'LIVE_STACK', 'LIVE_STACK_SIGMA', 'LIVE_STACK_REGISTRATION_SCALE'
+            ], kwargs=kwargs
+        )
+        self._stack_enabled = live_stack
+        self._stacker = libs.stacking.LiveStacker(
+            registration_scale=registration_scale, sigma=stack_sigma
+        )
+        self._stretch = libs.imaging.AutoStretch(
+            target_background=target_background, shadows_clipping=shadows_clipping
+        )
+        self._encoder = libs.encoders.encoder_factory(self._default_codec)
+        adaptive, target_fps, target_bitrate, min_scale, min_quality, max_quality = \
+            utils.config.values(
+                variables=[
+                    'STREAM_ADAPTIVE', 'STREAM_TARGET_FPS', 'STREAM_TARGET_BITRATE',
+                    'STREAM_MIN_SCALE', 'STREAM_MIN_QUALITY', 'STREAM_MAX_QUALITY'
+                ], kwargs=kwargs
+            )
+        self._stream = libs.quality.QualityController(
+            max_size=self._webp_size, quality=quality,
+            quality_bounds=(min_quality, max_quality),
+            min_scale=min_scale, target_fps=target_fps,
+            target_bitrate=target_bitrate, adaptive=adaptive,
+            quality_sensitive=self._encoder.quality_sensitive
+        )
+        workers, queue_size, policy = utils.config.values(
+            variables=[
+                'PIPELINE_WORKERS', 'PIPELINE_QUEUE_SIZE',
+                'PIPELINE_OVERFLOW_POLICY'
+            ], kwargs=kwargs
+        )
+        self._pipeline_workers = workers
+        self._pipeline_queue_size = queue_size
+        self._pipeline_policy = libs.pipeline.FramePipeline.parse_policy(policy)
+        delta, tile_size, pixel_threshold, keyframe_interval = \
+            utils.config.values(
+                variables=[
+                    'STREAM_DELTA', 'STREAM_DELTA_TILE_SIZE',
+                    'STREAM_DELTA_PIXEL_THRESHOLD', 'STREAM_DELTA_KEYFRAME_INTERVAL'
+                ], kwargs=kwargs
+            )
+        self._delta_enabled = delta
+        renditions, rendition_idle = utils.config.values(
+            variables=['STREAM_RENDITIONS', 'STREAM_RENDITION_IDLE'], kwargs=kwargs
+        )
+        self._renditions = libs.renditions.RenditionSet(
+            libs.renditions.parse_renditions(renditions),
+            idle_timeout=rendition_idle
+        )
+        self._photo_writer = libs.fits.photo_writer_factory(
+            utils.config.get('PHOTO_FORMAT', kwargs=kwargs)
+        )
+        # pushed and pulled frames reach different views, each keeps its own reference
+        self._deltas = {
+            consumer: libs.tiles.TileDeltaEncoder(
+                tile_size=tile_size, pixel_threshold=pixel_threshold,
+                keyframe_interval=keyframe_interval
+            ) for consumer in ('pull', 'push')
+        }
+        self._delta_consumers = frozenset()
+        self._delta_lock = Lock()
+        metrics_file, metrics_port, metrics_interval = utils.config.values(
+            variables=['METRICS_FILE', 'METRICS_PORT', 'METRICS_FILE_INTERVAL'],
+            kwargs=kwargs
+        )
+        self._metrics_file = metrics_file or None
+        self._metrics_port = metrics_port
+        self._metrics_interval = metrics_interval
+        profile_duration, profile_interval = utils.config.values(
+            variables=['PROFILE_DURATION', 'PROFILE_INTERVAL'], kwargs=kwargs
+        )
+        self._profile_duration = profile_duration
+        self._profile_interval = profile_interval
+        clock_sync_interval, latency_log_interval = utils.config.values(
+            variables=['CLOCK_SYNC_INTERVAL', 'LATENCY_LOG_INTERVAL'], kwargs=kwargs
+        )
+        self._clock_sync_interval = clock_sync_interval
+        self._latency_log_interval = latency_log_interval
+        self._stop_timeout = utils.config.get('LIFECYCLE_STOP_TIMEOUT', kwargs=kwargs)
+
+    def _release_frame(self, raw_image: np.ndarray, *_: Any) -> None:
+        self.camera.release_video_frame(raw_image)
+
+    def _drop_frame(self, raw_image: np.ndarray, *_: Any) -> None:
+        self._frames_total['dropped'].inc()
+        self._release_frame(raw_image)
+
+    def _resize(self,
+            image: np.ndarray, size: Tuple[int, int], name: Optional[str] = 'image'
+        ) -> np.ndarray:
+        shape = (size[1], size[0], *image.shape[2:])
+        buffer = getattr(self._resize_buffers, name, None)
+        if buffer is None or buffer.shape != shape or buffer.dtype != image.dtype:
+            buffer = np.empty(shape, dtype=image.dtype)
+            setattr(self._resize_buffers, name, buffer)
+        return cv2.resize(image, size, dst=buffer)
+
+    def _encode_renditions(self,
+            image: np.ndarray, encoder: libs.encoders.PreviewEncoder, quality: int
+        ) -> dict:
+        return {
+            rendition.name: {
+                'data': encoder.encode(level, quality),
+                'width': rendition.width, 'height': rendition.height
+            } for rendition, level in self._renditions.pyramid(image, self._resize)
+        }
 
+    def _encode_frame(self,
+            image: np.ndarray, encoder: libs.encoders.PreviewEncoder, quality: int
+        ) -> dict:
+        if not self._delta_enabled:
+            return {'data': encoder.encode(image, quality)}
+        if any(image is getattr(self._resize_buffers, name, None) for name in ('image', 'stacked')):
+            image = image.copy()
+        return {'_deltas': {
+            consumer: self._deltas[consumer].encode(
+                image, lambda tile: encoder.encode(tile, quality)
+            ) for consumer in self._delta_consumers
+        }}
+
+    @staticmethod
+    def _encoded_size(frame: dict) -> int:
+        return max([len(frame.get('data') or b'')] + [
+            len(delta['data'] or b'') + sum(len(tile['data']) for tile in delta['tiles'])
+            for delta in frame.get('_deltas', {}).values()
+        ])
+
+    def _reset_deltas(self) -> None:
+        for delta in self._deltas.values():
+            delta.reset()
+
+    def _track_delta_consumer(self, consumer: str, active: bool) -> None:
+        # pipeline workers read the set without a lock, so it is replaced rather than mutated
+        with self._delta_lock:
+            if active:
+                self._delta_consumers = self._delta_consumers | {consumer}
+            else:
+                self._delta_consumers = self._delta_consumers - {consumer}
+
+    def _process_image(self,
+            raw_image: np.ndarray, position: dict, seq: int,
+            image_format: Tuple[str, Optional[str]], trace: dict
+        ) -> None:
+        stages = self._stage_seconds
+        started = perf_counter()
+        stages['queue_wait'].observe(started - trace['coordinates'])
+        settings = self._stream.settings()
+        size = (settings.width, settings.height)
+        stack_enabled = self._stack_enabled
+        try:
+            image = libs.imaging.normalize_frame(
+                raw_image, *image_format, superpixel=self._superpixel
+            )
+            normalized = perf_counter()
+            # the stack keeps the full stream size, adaptive scaling would restart it
+            resized_image = self._resize(
+                image, tuple(self._stream.max_size) if stack_enabled else size
+            )
+        finally:
+            self._release_frame(raw_image)
+        resized = trace['resized'] = perf_counter()
+        stages['normalize'].observe(normalized - started)
+        stages['resize'].observe(resized - normalized)
+        stack = None
+        if stack_enabled:
+            resized_image, stack = self._stacker.add(resized_image)
+            if resized_image.shape[1::-1] != size:
+                resized_image = self._resize(resized_image, size, 'stacked')
+            stacked = perf_counter()
+            stages['stack'].observe(stacked - resized)
+            resized = stacked
+        stretch = None
+        if self._stretch_enabled:
+            resized_image, stretch = self._stretch.apply(resized_image)
+            stretch = stretch._asdict()
+        else:
+            resized_image = libs.imaging.to_uint8(resized_image)
+        encoder = self._encoder
+        stretched = perf_counter()
+        stages['stretch'].observe(stretched - resized)
+        frame = self._encode_frame(resized_image, encoder, settings.quality)
+        encoded_size = self._encoded_size(frame)
+        trace['encoded'] = perf_counter()
+        encode_seconds = trace['encoded'] - stretched
+        stages['encode'].observe(encode_seconds)
+        self._stream.record_encode(encode_seconds, encoded_size)
+        renditions = self._encode_renditions(resized_image, encoder, settings.quality)
+        stages['renditions'].observe(perf_counter() - trace['encoded'])
+        frame.update({
+            'position': position, 'codec': encoder.name,
+            'stream': settings._asdict(), 'stretch': stretch,
+            'stack': stack, '_trace': trace, '_renditions': renditions
+        })
+        trace['queued'] = perf_counter()
+        self._frame.publish(seq, frame)
+        self._frames_total['processed'].inc()
+
+    def _prepare_frame(self,
+            frame: dict, rendition: Optional[str] = None, consumer: Optional[str] = 'pull'
+        ) -> Optional[dict]:
+        if rendition in frame['_renditions']:
+            level = frame['_renditions'][rendition]
+            return {
+                'data': level['data'], 'rendition': rendition,
+                'position': frame['position'], 'codec': frame['codec'],
+                'stream': {
+                    **frame['stream'],
+                    'width': level['width'], 'height': level['height']
+                },
+                'stretch': frame['stretch'], 'stack': frame['stack']
+            }
+        if '_deltas' in frame:
+            delta = frame['_deltas'].get(consumer)
+            # encoded against a reference the consumer has moved past, wait for the next frame
+            if delta is None or not self._deltas[consumer].acknowledge(delta):
+                return None
+            frame = {**frame, **delta}
+        return {key: value for key, value in frame.items() if key[0] != '_'}
+
+    def _photo_cards(self, started: float, ra: float, dec: float) -> List[Tuple]:
+        parameters = self.camera.parameters
+        dec = dec * 360 if dec <= 0.5 else dec * 360 - 360
+        # past the pole the mount reports declinations beyond 90 degrees
+        if abs(dec) > 90:
+            dec = (180 if dec > 0 else -180) - dec
+        cards = [
+            ('DATE-OBS', libs.fits.observation_date(started), 'UTC start of exposure'),
+            ('INSTRUME', self.camera.name, 'camera'),
+            ('COLORTYP', self.camera.color_format, 'sensor image type'),
+            ('ROWORDER', 'TOP-DOWN', 'order of the rows in image array'),
+            ('RA', ra * 360, '[deg] mount right ascension'),
+            ('DEC', dec, '[deg] mount declination')
+        ]
+        if 'exposition' in parameters:
+            cards.append(('EXPTIME', parameters['exposition'] * 0.000001, '[s] exposure time'))
+        if 'gain' in parameters:
+            cards.append(('GAIN', parameters['gain'], 'sensor gain'))
+        if 'gamma' in parameters:
+            cards.append(('GAMMA', parameters['gamma'], 'camera gamma'))
+        if self.camera.color_format in ('RAW8', 'RAW16') and self.camera.bayer_pattern:
+            cards.append(('BAYERPAT', _bayer_names[self.camera.bayer_pattern], 'sensor mosaic'))
+        return cards
+
+    def _capture_photo(self, job: dict) -> Tuple[np.ndarray, List[Tuple]]:
+        with self._video_lock:
+            self._photo_exposing = True
+            self._video_requested = self._hardware.running and not self._hardware.stopping
+            if self._video_requested:
+                self._hardware.stop()
+                self.camera.stop_video_capture()
+        try:
+            # the photo must not overlap a video exposure still in progress
+            if not self._hardware.join(self._stop_timeout):
+                raise RuntimeError('Video capture did not stop before the photo')
+            return self._expose(job['options'])
+        finally:
+            with self._video_lock:
+                self._photo_exposing = False
+                if self._video_requested:
+                    self._hardware.start()
+
+    def _expose(self, options: dict) -> Tuple[np.ndarray, List[Tuple]]:
+        parameters = self.camera.parameters
+        overrides = {key: value for key, value in options.items() if key != 'format'}
+        changed = any(parameters.get(key) != value for key, value in overrides.items())
+        if changed:
+            self.camera.update_paramerers({**parameters, **overrides})
+        try:
+            started = time()
+            ra, dec = self.mount.get_ra_dec()
+            image = self.camera.capture()
+            return image, self._photo_cards(started, ra, dec)
+        finally:
+            if changed:
+                self.camera.update_paramerers(parameters)
+
+    def _write_photo(self, job: dict, exposure: Tuple[np.ndarray, List[Tuple]]) -> str:
+        image, cards = exposure
+        writer = self._photo_writer
+        if 'format' in job['options']:
+            writer = libs.fits.photo_writer_factory(job['options']['format'])
+        os.makedirs(self._path, exist_ok=True)
+        return writer.write(os.path.join(self._path, job['job_id']), image, cards)
+
+    def start_profile(self, duration: Optional[float] = None) -> dict:
+        duration = self._profile_duration if duration is None else float(duration)
+        path = os.path.join(
+            os.path.dirname(self._path), 'Uniscope_profiles',
+            strftime('%Y%m%d-%H%M%S') + '.collapsed'
+        )
+        started = self._profiler.start(
+            duration, path, on_complete=lambda filename, samples: self._emit(
+                'profile_complete', {'filename': filename, 'samples': samples}
+            )
+        )
+        if not started:
+            return {'state': 'busy', 'filename': None}
+        return {'state': 'started', 'filename': path, 'duration': duration}
+
+    def _handle_profile_signal(self, *_: Any) -> None:
+        self.start_profile()
+
+    def _trace_frame(self, seq: int, trace: dict) -> dict:
+        sent = perf_counter()
+        age = sent - trace['exposure_end']
+        self._latency_seconds['capture_to_send'].observe(age)
+        self._latency['capture_to_send'].add(age)
+        with self._traces_lock:
+            self._sent_traces[seq] = trace['exposure_end']
+            while len(self._sent_traces) > 64:
+                self._sent_traces.popitem(last=False)
+        self._log_latency()
+        return {
+            **{stage: self._clock.to_epoch_ms(value) for stage, value in trace.items()},
+            'sent': self._clock.to_epoch_ms(sent),
+            'clock_offset': self._clock_offset.offset
+        }
 
-    def _get_photo_filename(self) -> None:
-        filename = utils.random_hash() + '.png'
-        return os.path.join(self._path, filename)
+    def _record_display(self, report: Any) -> None:
+        if not isinstance(report, dict) or None in (report.get('seq'), report.get('timestamp')):
+            return
+        with self._traces_lock:
+            exposure_end = self._sent_traces.get(report['seq'])
+        displayed = self._clock_offset.to_local(report['timestamp'])
+        if exposure_end is None or displayed is None:
+            return
+        latency = (displayed - self._clock.to_epoch_ms(exposure_end)) / 1e3
+        self._latency_seconds['capture_to_display'].observe(latency)
+        self._latency['capture_to_display'].add(latency)
+        self._log_latency()
+
+    def _log_latency(self) -> None:
+        for span, summary in self._latency.items():
+            if not summary.report_due():
+                continue
+            percentiles = summary.percentiles()
+            print(
+                f'[HARDEND] {span} latency over {percentiles["count"]} frames: ' + ', '.join(
+                    f'{key}={percentiles[key] * 1e3:.1f}ms' for key in ('p50', 'p95', 'p99')
+                )
+            )
+
+    def _sync_clock(self) -> None:
+        sent = self._clock.now_ms()
+        try:
+            response = self.sio.call('clock_sync', {'hardend': sent}, timeout=2)
+        except socketio_exceptions.SocketIOError:
+            return
+        received = self._clock.now_ms()
+        if isinstance(response, dict) and 'server' in response:
+            self._clock_offset.add(sent, float(response['server']), received)
+
+    def _clock_sync_loop(self, stopped: Event) -> None:
+        for _ in range(5):
+            if stopped.is_set():
+                return
+            self._sync_clock()
+        while self.sio.connected and not stopped.wait(self._clock_sync_interval):
+            self._sync_clock()
+
+    def _start_clock_sync(self) -> None:
+        if not self._clock_sync.running:
+            self._clock_sync.start()
+
+    def _emit(self, event: str, data: dict) -> None:
+        sio = getattr(self, 'sio', None)
+        if sio is not None and sio.connected:
+            sio.emit(event, data)
 
     def serve(self) -> None:
-        self.sio.connect(
-            self.server['path'],
-            socketio_path=self.server['subpath'] + '/socket.io/',
-            wait=False, auth={
-            'clientType': 'hardend',
-            'telescopeId': self.telescope_id
-        })
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self._handle_profile_signal)
         try:
-            while True:
-                sleep(10)
+            self._lifecycle.start()
+            while not self._shutdown.wait(1.0):
+                pass
         except KeyboardInterrupt:
-            self.sio.disconnect()
-        except Exception as exception:
-            self.sio.disconnect()
-            raise exception
+            pass
+        finally:
+            self._lifecycle.stop()
+        if self._failure is not None:
+            raise self._failure
 
 
 class InterfacedTelescopeMixin(BaseTelescope):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._set_socketio_hook()
+        max_credits = utils.config.get('STREAM_PUSH_MAX_CREDITS', kwargs=kwargs)
+        self._streamer = libs.streaming.CreditStreamer(
+            self._frame, self._push_frame, max_credits=max_credits
+        )
+        self._push_rendition = None
+        # the async runtime brings its own client, so one is only built when connecting
+        self.sio = None
+        self._lifecycle.add('stream', stop=self._stop_streaming)
+        self._lifecycle.add(
+            'socket', start=self._connect_socket, stop=lambda _: self.sio.disconnect()
+        )
+        self._lifecycle.add('clock-sync', stop=self._clock_sync.stop_and_join)
 
     def _set_socketio_hook(self) -> None:
         self.sio = Client(handle_sigint=True)
@@ -106,32 +603,163 @@ class InterfacedTelescopeMixin(BaseTelescope):
             if name in interfaces.telescope.TelescopeInterface.__dict__:
                 self.sio.on(name)(method)
 
+    def _connect_socket(self) -> None:
+        if self.sio is None:
+            self._set_socketio_hook()
+        self.sio.connect(
+            self.server['path'],
+            socketio_path=self.server['subpath'] + '/socket.io/',
+            wait=False, auth={
+            'clientType': 'hardend',
+            'telescopeId': self.telescope_id,
+            'codecs': libs.encoders.available_encoders()
+        })
+
+    def _use_encoder(self, encoder: libs.encoders.PreviewEncoder) -> None:
+        self._encoder = encoder
+        self._stream.quality_sensitive = encoder.quality_sensitive
+
+    def _stop_streaming(self, timeout: Optional[float] = None) -> bool:
+        self._streamer.stop()
+        return self._streamer.join(timeout)
+
     def connect(self) -> None:
+        self._use_encoder(libs.encoders.encoder_factory(self._default_codec))
+        self._reset_deltas()
+        with self._delta_lock:
+            self._delta_consumers = frozenset()
+        self._start_clock_sync()
         self._start_video_capture()
 
     def disconnect(self) -> None:
+        self._streamer.stop()
         self.stop_actions()
 
-    def get_frame(self) -> dict:
+    def _ensure_video_capture(self) -> None:
         # FIXME: Create new event called 'initialize' # pylint: disable=fixme
-        if not self.camera._running: # pylint: disable=protected-access
-            self._start_video_capture()
-        while self._frame['sent'] == self._frame['last']:
-            sleep(0.1)
-        self._frame['sent'] = self._frame['last']
-        currnet_frame = dict(self._frame['sent'])
+        with self._video_lock:
+            if self._photo_exposing:
+                # the photo thread restarts video capture once the exposure is done
+                self._video_requested = True
+            # a worker still winding down after stop_actions is restarted once it returns
+            elif not self._hardware.running or self._hardware.stopping:
+                self._hardware.start()
+
+    def _request_rendition(self, rendition: Optional[str]) -> None:
+        if rendition is not None:
+            self._renditions.request(rendition)
+
+    def _build_frame(self,
+            seq: int, frame: dict, rendition: Optional[str] = None,
+            consumer: Optional[str] = 'pull'
+        ) -> Optional[dict]:
+        currnet_frame = self._prepare_frame(frame, rendition, consumer)
+        if currnet_frame is None:
+            return None
+        currnet_frame['seq'] = seq
         currnet_frame['timestamps'] = {
             'hardend': int(time() * 1e3)
         }
+        currnet_frame['trace'] = self._trace_frame(seq, frame['_trace'])
+        self._frames_total['sent'].inc()
+        self._stream.record_response()
         return currnet_frame
 
+    def _push_frame(self, seq: int, frame: dict) -> bool:
+        rendition = self._push_rendition
+        self._request_rendition(rendition)
+        currnet_frame = self._build_frame(seq, frame, rendition, 'push')
+        if currnet_frame is None:
+            return False
+        self._emit('frame', currnet_frame)
+        return True
+
+    def _frame_request(self, data: dict) -> int:
+        self._request_rendition(data.get('rendition'))
+        self._ensure_video_capture()
+        self._stream.record_request()
+        self._record_display(data.get('displayed'))
+        self._track_delta_consumer('pull', True)
+        return data.get('after', self._sent_seq)
+
+    def _frame_response(self,
+            data: dict, newer: Optional[Tuple[int, dict]], waited: float
+        ) -> Optional[dict]:
+        self._stage_seconds['get_frame_wait'].observe(waited)
+        if newer is None:
+            return None
+        # pushed frames advance the streamer cursor, this one only tracks pulls
+        self._sent_seq = newer[0]
+        return self._build_frame(*newer, data.get('rendition'), 'pull')
+
+    def get_frame(self, data: Optional[dict] = None) -> Optional[dict]:
+        data = data or {}
+        try:
+            after = self._frame_request(data)
+        except ValueError as exception:
+            return {'error': str(exception)}
+        timeout = data.get('timeout')
+        started = perf_counter()
+        while True:
+            remaining = None if timeout is None else \
+                max(0.0, timeout - (perf_counter() - started))
+            newer = self._frame.wait_newer(seq=after, timeout=remaining)
+            currnet_frame = self._frame_response(data, newer, perf_counter() - started)
+            if currnet_frame is not None or newer is None:
+                return currnet_frame
+            after = newer[0]
+
+    def start_stream(self, data: Optional[dict] = None) -> dict:
+        data = data or {}
+        try:
+            self._request_rendition(data.get('rendition'))
+        except ValueError as exception:
+            return {'state': 'rejected', 'error': str(exception)}
+        self._ensure_video_capture()
+        self._push_rendition = data.get('rendition')
+        self._deltas['push'].reset()
+        self._track_delta_consumer('push', True)
+        granted = self._streamer.start(data.get('credits', 1), after=data.get('after'))
+        return {'state': 'streaming', 'credits': granted}
+
+    def frame_ack(self, data: dict) -> None:
+        self._stream.record_request()
+        self._record_display(data.get('displayed'))
+        self._streamer.grant(data.get('credits', 1))
+
+    def stop_stream(self, data: Optional[dict] = None) -> dict:
+        self._streamer.stop()
+        self._track_delta_consumer('push', False)
+        return {'state': 'stopped'}
+
     def camera_settings_changed(self, data: dict) -> None:
         self.camera.update_paramerers(data)
 
+    def stream_settings_changed(self, data: dict) -> Optional[dict]:
+        if 'codec' in data:
+            options = data.get('options') or {}
+            if not isinstance(options, dict):
+                return {'state': 'rejected', 'error': f'Options {options!r} are not a mapping'}
+            try:
+                encoder = libs.encoders.encoder_factory(data['codec'], **options)
+            except ValueError as exception:
+                return {'state': 'rejected', 'error': str(exception)}
+            self._use_encoder(encoder)
+        if 'delta' in data:
+            self._delta_enabled = bool(data['delta'])
+        if 'stretch' in data:
+            self._stretch_enabled = bool(data['stretch'])
+        if 'live_stack' in data:
+            self._stack_enabled = bool(data['live_stack'])
+            self._stacker.reset()
+        self._reset_deltas()
+
     def mount_settings_changed(self, data: dict) -> None:
+        self._stacker.reset()
         self.mount.goto_coordinates(data)
 
     def start_slew(self, data: dict) -> None:
+        self._stacker.reset()
         self.mount.start_slew(data)
 
     def stop_slew(self) -> None:
@@ -141,9 +769,21 @@ class InterfacedTelescopeMixin(BaseTelescope):
         self.stop_slew()
         self._stop_video_capture()
 
-    def take_photo(self) -> None:
-        filename = self._get_photo_filename()
-        self.camera.capture(filename)
+    def take_photo(self, data: Optional[dict] = None) -> dict:
+        try:
+            if 'format' in (data or {}):
+                libs.fits.photo_writer_factory(data['format'])
+            return self.photos.submit(utils.random_hash(), data)
+        except (libs.photos.PhotoQueueFullError, ValueError) as exception:
+            return {'job_id': None, 'state': 'rejected', 'error': str(exception)}
+
+    def metrics(self, data: Optional[dict] = None) -> dict:
+        if (data or {}).get('format') == 'prometheus':
+            return {'prometheus': self._metrics.prometheus()}
+        return self._metrics.snapshot()
+
+    def profile(self, data: Optional[dict] = None) -> dict:
+        return self.start_profile((data or {}).get('duration'))
 
 
 class MockTelescope(InterfacedTelescopeMixin):
@@ -156,14 +796,33 @@ class MockTelescope(InterfacedTelescopeMixin):
         print('[HARDEND] Disconnected')
         super().disconnect()
 
-    def get_frame(self) -> dict:
+    def get_frame(self, data: Optional[dict] = None) -> Optional[dict]:
         print('[HARDEND] Called `get_frame` method')
-        return super().get_frame()
+        return super().get_frame(data)
+
+    def start_stream(self, data: Optional[dict] = None) -> dict:
+        print(
+            '[HARDEND] Called `start_stream` method ' \
+            'with args ' + utils.json_stringify(data)
+        )
+        return super().start_stream(data)
+
+    def frame_ack(self, data: dict) -> None:
+        print('[HARDEND] Called `frame_ack` method')
+        super().frame_ack(data)
+
+    def stop_stream(self, data: Optional[dict] = None) -> dict:
+        print('[HARDEND] Called `stop_stream` method')
+        return super().stop_stream(data)
 
     def camera_settings_changed(self, data: dict) -> None:
         print('[HARDEND] Called `camera_settings_changed` method')
         super().camera_settings_changed(data)
 
+    def stream_settings_changed(self, data: dict) -> Optional[dict]:
+        print('[HARDEND] Called `stream_settings_changed` method')
+        return super().stream_settings_changed(data)
+
     def mount_settings_changed(self, data: dict) -> None:
         print('[HARDEND] Called `mount_settings_changed` method')
         super().mount_settings_changed(data)
@@ -180,9 +839,17 @@ class MockTelescope(InterfacedTelescopeMixin):
         print('[HARDEND] Called `stop_actions` method')
         super().stop_actions()
 
-    def take_photo(self) -> None:
+    def take_photo(self, data: Optional[dict] = None) -> dict:
         print('[HARDEND] Called `take_photo` method')
-        super().take_photo()
+        return super().take_photo(data)
+
+    def metrics(self, data: Optional[dict] = None) -> dict:
+        print('[HARDEND] Called `metrics` method')
+        return super().metrics(data)
+
+    def profile(self, data: Optional[dict] = None) -> dict:
+        print('[HARDEND] Called `profile` method')
+        return super().profile(data)
 
 
 class RealTelescope(InterfacedTelescopeMixin):
@@ -192,11 +859,125 @@ class RealTelescope(InterfacedTelescopeMixin):
         utils.create_folder_if_not_exist(self._path)
 
 
-def telescope_factory(workmode: str, server: dict, **kwargs: Optional[Any]) -> Type[BaseTelescope]:
-    telescope_id = utils.get_kwargs_or_dotenv_values('TELESCOPE_ID', kwargs=kwargs)
-    camera =  models.camera.camera_factory(workmode=workmode)
+class AsyncTelescope(interfaces.telescope.AsyncTelescopeInterface):
+    # pylint: disable=protected-access
+
+    def __init__(self,
+            telescope: InterfacedTelescopeMixin,
+            workers: Optional[int] = 4
+        ) -> None:
+        self.telescope = telescope
+        self.telescope_id = telescope.telescope_id
+        self.server = telescope.server
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='telescope-offload'
+        )
+        # frame waits block for a whole exposure, control events must not queue behind them
+        self._frame_executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='telescope-frames'
+        )
+        self._set_socketio_hook()
+
+    def _set_socketio_hook(self) -> None:
+        self.sio = AsyncClient(handle_sigint=True)
+        for name, method in utils.get_methods_by_class_instance(self):
+            if name in interfaces.telescope.AsyncTelescopeInterface.__dict__:
+                self.sio.on(name)(method)
+
+    async def _offload(self, function: Callable, *args: Any) -> Any:
+        return await utils.run_in_executor(self._executor, function, *args)
+
+    async def _offload_frame(self, function: Callable, *args: Any) -> Any:
+        return await utils.run_in_executor(self._frame_executor, function, *args)
+
+    async def connect(self) -> None:
+        await self._offload(self.telescope.connect)
+
+    async def disconnect(self) -> None:
+        await self._offload(self.telescope.disconnect)
+
+    async def get_frame(self, data: Optional[dict] = None) -> Optional[dict]:
+        return await self._offload_frame(self.telescope.get_frame, data)
+
+    async def start_stream(self, data: Optional[dict] = None) -> dict:
+        return await self._offload(self.telescope.start_stream, data)
+
+    async def frame_ack(self, data: dict) -> None:
+        await self._offload(self.telescope.frame_ack, data)
+
+    async def stop_stream(self, data: Optional[dict] = None) -> dict:
+        return await self._offload(self.telescope.stop_stream, data)
+
+    async def camera_settings_changed(self, data: dict) -> None:
+        await self._offload(self.telescope.camera_settings_changed, data)
+
+    async def stream_settings_changed(self, data: dict) -> Optional[dict]:
+        return await self._offload(self.telescope.stream_settings_changed, data)
+
+    async def mount_settings_changed(self, data: dict) -> None:
+        await self._offload(self.telescope.mount_settings_changed, data)
+
+    async def start_slew(self, data: dict) -> None:
+        await self._offload(self.telescope.start_slew, data)
+
+    async def stop_slew(self) -> None:
+        await self._offload(self.telescope.stop_slew)
+
+    async def stop_actions(self) -> None:
+        await self._offload(self.telescope.stop_actions)
+
+    async def take_photo(self, data: Optional[dict] = None) -> dict:
+        return await self._offload(self.telescope.take_photo, data)
+
+    async def metrics(self, data: Optional[dict] = None) -> dict:
+        return await self._offload(self.telescope.metrics, data)
+
+    async def profile(self, data: Optional[dict] = None) -> dict:
+        return await self._offload(self.telescope.profile, data)
+
+    async def _serve(self) -> None:
+        telescope = self.telescope
+        loop = asyncio.get_running_loop()
+        telescope.sio = libs.eventloop.ThreadsafeClient(self.sio, loop)
+        if hasattr(signal, 'SIGUSR1'):
+            loop.add_signal_handler(signal.SIGUSR1, telescope._handle_profile_signal)
+        waiters = []
+        try:
+            await self._offload(telescope._lifecycle.start)
+            waiters = [
+                asyncio.ensure_future(self.sio.wait()),
+                loop.run_in_executor(None, telescope._shutdown.wait)
+            ]
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            telescope._shutdown.set()
+            for waiter in waiters:
+                waiter.cancel()
+            await self._offload(telescope._lifecycle.stop)
+            self._executor.shutdown(wait=False)
+            self._frame_executor.shutdown(wait=False)
+
+    def serve(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            pass
+        if self.telescope._failure is not None:
+            raise self.telescope._failure
+
+
+def telescope_factory(
+        workmode: str, server: dict, **kwargs: Optional[Any]
+    ) -> Union[Type[BaseTelescope], AsyncTelescope]:
+    telescope_id = utils.config.get('TELESCOPE_ID', kwargs=kwargs)
+    runtime, workers = utils.config.values(
+        variables=['TELESCOPE_RUNTIME', 'ASYNC_EXECUTOR_WORKERS'], kwargs=kwargs
+    )
+    if runtime not in ('sync', 'async'):
+        raise ValueError(f'Runtime {runtime!r} is not defined')
     mount =  models.mount.mount_factory(workmode=workmode)
-    if workmode == 'real':
+    camera =  models.camera.camera_factory(workmode=workmode, mount=mount)
+    if workmode in ('real', 'simulator'):
         telescope = RealTelescope(
             telescope_id=telescope_id, server=server,
             camera=camera, mount=mount
@@ -208,4 +989,6 @@ def telescope_factory(workmode: str, server: dict, **kwargs: Optional[Any]) -> T
         )
     else:
         raise ValueError(f'Workmode {workmode!r} is not defined')
+    if runtime == 'async':
+        return AsyncTelescope(telescope, workers=workers)
     return telescope
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from libs import quality
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class QualityControllerTest(TestCase):
+
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        patcher = patch.object(quality, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.controller = quality.QualityController(
+            max_size=(1920, 1080), quality=75, target_fps=10.0,
+            target_bitrate=4e6, adjust_period=1.0
+        )
+
+    def _serve(self, exposure: float, client: float, frames: int) -> None:
+        for _ in range(frames):
+            self.controller.record_request()
+            self.clock.now += exposure
+            self.controller.record_encode(0.005, 20000)
+            self.controller.record_response()
+            self.clock.now += client
+
+    def test_long_exposures_on_a_fast_client_keep_quality(self) -> None:
+        self._serve(exposure=1.0, client=0.005, frames=30)
+        settings = self.controller.settings()
+        self.assertEqual((settings.width, settings.height), (1920, 1080))
+        self.assertGreaterEqual(settings.quality, 75)
+
+    def test_slow_client_lowers_quality(self) -> None:
+        self._serve(exposure=0.01, client=0.5, frames=30)
+        self.assertLess(self.controller.settings().quality, 75)
+
+
+if __name__ == '__main__':
+    main()
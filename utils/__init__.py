@@ -1,39 +1,58 @@
 from __future__ import annotations
 
 from typing import Tuple, Iterator, Union, Any, Optional, List, Callable
-from threading import Thread, main_thread, enumerate as avalable_threads
+from threading import Lock
+from concurrent.futures import Executor
 from uuid import uuid4 as _random_hash
 
 from pygit2.errors import GitError
-from dotenv import dotenv_values
+from dotenv import dotenv_values, find_dotenv
 from pygit2 import Repository # pylint: disable=ungrouped-imports
 from json import dumps
 from math import ceil
+import asyncio
 import inspect
-import ctypes
 import zwoasi
 import os
 
 __all__ = [
-    'get_kwargs_or_dotenv_values', 'kill_all_threads',
+    'get_kwargs_or_dotenv_values',
     'get_methods_by_class_instance', 'random_hash',
-    'create_folder_if_not_exist', 'kill_thread',
+    'create_folder_if_not_exist',
     'installation_warning', 'json_stringify',
-    'init_zwoasi_drivers', 'get_project_url'
+    'init_zwoasi_drivers', 'get_project_url',
+    'run_in_executor', 'Config', 'config'
 ]
 
-def kill_thread(thread: Thread, exception: Exception = SystemExit) -> None:
-    if thread is not None and thread.is_alive():
-        exc = ctypes.py_object(exception)
-        ctypes.pythonapi.PyThreadState_SetAsyncExc(
-            ctypes.c_long(thread.ident), exc
-        )
-
-
-def kill_all_threads() -> None:
-    for thread in avalable_threads():
-        if thread != main_thread():
-            kill_thread(thread)
+_config_types = {
+    **dict.fromkeys([
+        'WEBP_IMAGE_WIDTH', 'WEBP_IMAGE_HEIGHT', 'WEBP_IMAGE_QUALITY',
+        'STREAM_MIN_QUALITY', 'STREAM_MAX_QUALITY', 'STREAM_DELTA_TILE_SIZE',
+        'STREAM_DELTA_PIXEL_THRESHOLD', 'STREAM_DELTA_KEYFRAME_INTERVAL',
+        'PIPELINE_WORKERS', 'PIPELINE_QUEUE_SIZE', 'CAMERA_BUFFERS',
+        'MOCK_CAMERA_WIDTH', 'MOCK_CAMERA_HEIGHT', 'MOCK_CAMERA_SEED',
+        'MOCK_CAMERA_RING_SIZE', 'SYNSCAN_SIMULATOR_BAUDRATE',
+        'FILENAME_HASH_LENGTH', 'METRICS_PORT', 'STREAM_PUSH_MAX_CREDITS',
+        'ASYNC_EXECUTOR_WORKERS'
+    ], int),
+    **dict.fromkeys([
+        'PREVIEW_STRETCH_BACKGROUND', 'PREVIEW_STRETCH_SHADOWS',
+        'LIVE_STACK_SIGMA', 'LIVE_STACK_REGISTRATION_SCALE',
+        'STREAM_TARGET_FPS', 'STREAM_TARGET_BITRATE', 'STREAM_MIN_SCALE',
+        'MOUNT_POLL_RATE', 'MOCK_CAMERA_PIXELS_PER_DEGREE',
+        'SYNSCAN_SIMULATOR_LATENCY', 'METRICS_FILE_INTERVAL',
+        'PROFILE_DURATION', 'PROFILE_INTERVAL', 'CLOCK_SYNC_INTERVAL',
+        'LATENCY_LOG_INTERVAL', 'STREAM_RENDITION_IDLE', 'LIFECYCLE_STOP_TIMEOUT'
+    ], float),
+    **dict.fromkeys([
+        'PREVIEW_AUTO_STRETCH', 'LIVE_STACK', 'STREAM_ADAPTIVE', 'STREAM_DELTA'
+    ], bool),
+    **dict.fromkeys([
+        'PREVIEW_CODEC', 'PREVIEW_DEBAYER', 'PIPELINE_OVERFLOW_POLICY',
+        'PHOTO_FORMAT', 'TELESCOPE_ID', 'PROJECT_BRANCHES',
+        'METRICS_FILE', 'STREAM_RENDITIONS', 'TELESCOPE_RUNTIME'
+    ], str)
+}
 
 
 def installation_warning() -> None:
@@ -56,23 +75,92 @@ def get_project_url() -> Iterator[str]:
             yield f'https://{branch}.uniscope.space/'
 
 
+def _parse_bool(value: str) -> bool:
+    if value.strip().lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.strip().lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f'{value!r} is not a boolean')
+
+
+class Config:
+
+    def __init__(self, path: Optional[str] = None, types: Optional[dict] = None) -> None:
+        self.path = path or find_dotenv()
+        self.types = _config_types if types is None else types
+        self._lock = Lock()
+        self._mtime = -1
+        self._values = {}
+        self._typed = {}
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime != self._mtime:
+                self._values = dotenv_values(self.path) if mtime is not None else {}
+                self._typed = {}
+                self._mtime = mtime
+
+    def _convert(self, name: str, value: str) -> Any:
+        kind = self.types.get(name, str)
+        return _parse_bool(value) if kind is bool else kind(value)
+
+    def raw(self, name: str, kwargs: Optional[dict] = None) -> Any:
+        if kwargs and name in kwargs:
+            return kwargs[name]
+        if name in os.environ:
+            return os.environ[name]
+        self._refresh()
+        return self._values[name]
+
+    def get(self, name: str, kwargs: Optional[dict] = None) -> Any:
+        if kwargs and name in kwargs:
+            value = kwargs[name]
+            return self._convert(name, value) if isinstance(value, str) else value
+        if name in os.environ:
+            return self._convert(name, os.environ[name])
+        self._refresh()
+        typed = self._typed
+        if name not in typed:
+            typed[name] = self._convert(name, self._values[name])
+        return typed[name]
+
+    def values(self, variables: List[str], kwargs: Optional[dict] = None) -> List[Any]:
+        return [self.get(variable, kwargs) for variable in variables]
+
+    def validate(self) -> None:
+        errors = []
+        for name in self.types:
+            try:
+                self.get(name)
+            except KeyError:
+                errors.append(f'{name} is not set')
+            except (TypeError, ValueError) as exception:
+                errors.append(f'{name}: {exception}')
+        if errors:
+            raise ValueError('Invalid configuration: ' + '; '.join(errors))
+
+
+config = Config()
+
+
 def get_kwargs_or_dotenv_values(
         variables: Union[Iterator[str], str],
         kwargs: Optional[dict] = None
     ) -> Union[List[Any], Any]:
-    if kwargs is None:
-        kwargs = {}
-    values = { **dotenv_values(), **os.environ, **kwargs }
     if isinstance(variables, str):
-        return values[variables]
-    return [values[variable] for variable in variables]
+        return config.raw(variables, kwargs)
+    return [config.raw(variable, kwargs) for variable in variables]
 
 
 def random_hash(length: Optional[int] = None) -> str:
     if length is None:
-        length = int(
-            get_kwargs_or_dotenv_values('FILENAME_HASH_LENGTH')
-        )
+        length = config.get('FILENAME_HASH_LENGTH')
     return ''.join(
         _random_hash().hex for i in range(ceil(length / 32))
     )[:length]
@@ -89,6 +177,10 @@ def get_methods_by_class_instance(intance: Any) -> List[Callable]:
     return inspect.getmembers(intance, predicate=inspect.ismethod)
 
 
+async def run_in_executor(executor: Optional[Executor], function: Callable, *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
 def json_stringify(data: dict) -> str:
     return dumps(data, indent=4)
 